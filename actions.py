@@ -0,0 +1,198 @@
+# --- Standard library ---
+import asyncio
+import datetime
+from collections import Counter
+
+# --- Third-party packages ---
+import aiohttp
+import discord
+
+# --- Local modules ---
+from metrics import BATCH_BUCKETS, Histogram
+
+# --- Rate limits
+# discord.py paces every request by Discord's own bucket (X-RateLimit-* headers of
+# every response), waits out 429s and retries 5xx / connection resets, all within its
+# five tries per request. That is the only retry budget: actions are not retried here.
+MAX_RATE_LIMIT_WAIT = 60  # seconds, the client's max_ratelimit_timeout: longer waits fail instead
+
+# --- Bulk delete
+BULK_DELETE_MAX = 100      # Messages per bulk delete call
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14, minutes=-5)  # Discord refuses older messages
+DELETE_BATCH_DELAY = 0.25  # seconds deletes are collected per channel
+
+
+# Outcome of a REST action
+class ActionResult:
+    def __init__(self, route, ok, value=None, error=None):
+        self.route = route        # (action, snowflake), for stats and logs
+        self.ok = ok
+        self.value = value        # Whatever the discord.py call returned
+        self.error = error        # Exception when ok is False
+
+    @property
+    def status(self):
+        if self.ok:
+            return 200
+        if isinstance(self.error, discord.RateLimited):
+            return 429
+        return getattr(self.error, "status", None)
+
+    def __bool__(self):
+        return self.ok
+
+    def __repr__(self):
+        return f"<ActionResult route={self.route} ok={self.ok} status={self.status}>"
+
+
+# Outbound REST actions (thread create, deletes, thread edits, sends). Each runs once
+# (see Rate limits above) and callers always get an ActionResult back instead of an
+# exception.
+class RestActions:
+    def __init__(self):
+        self.stats = {
+            "requests": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "rate_limited": 0,   # Gave up on a retry-after above MAX_RATE_LIMIT_WAIT
+        }
+        self.calls = Counter()   # (action, status): requests, status "network" for transport errors
+
+    async def run(self, route, action):
+        # `action` is a zero-argument callable returning the discord.py coroutine
+        self.stats["requests"] += 1
+        try:
+            value = await action()
+        except discord.RateLimited as e:
+            self.stats["rate_limited"] += 1
+            return self.failed(route, 429, e)
+        except discord.HTTPException as e:
+            return self.failed(route, e.status, e)
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            return self.failed(route, "network", e)
+
+        self.calls[(route[0], 200)] += 1
+        self.stats["succeeded"] += 1
+        return ActionResult(route, True, value=value)
+
+    def failed(self, route, status, error):
+        self.calls[(route[0], status)] += 1
+        self.stats["failed"] += 1
+        return ActionResult(route, False, error=error)
+
+    # --- Actions
+    async def create_thread(self, channel, message, name):
+        return await self.run(
+            ("create_thread", channel.id),
+            lambda: channel.create_thread(
+                name=name,
+                message=message,
+                type=discord.ChannelType.public_thread
+            )
+        )
+
+    async def delete_message(self, message):
+        return await self.run(("delete_message", message.channel.id), message.delete)
+
+    async def edit_message(self, message, **fields):
+        return await self.run(("edit_message", message.channel.id), lambda: message.edit(**fields))
+
+    async def edit_thread(self, thread, **fields):
+        return await self.run(("edit_thread", thread.id), lambda: thread.edit(**fields))
+
+    async def send(self, channel, content=None, **kwargs):
+        return await self.run(("send", channel.id), lambda: channel.send(content, **kwargs))
+
+    async def reply(self, message, content=None, **kwargs):
+        return await self.run(("send", message.channel.id), lambda: message.reply(content, **kwargs))
+
+
+# Collects deletes per channel for DELETE_BATCH_DELAY seconds and sends them as
+# channel.delete_messages calls (up to BULK_DELETE_MAX each) when more than one is
+# pending. Messages too old for bulk delete, lone deletes and failed bulk calls go
+# out as single deletes. delete() returns a future resolved with the ActionResult.
+class DeleteBatcher:
+    def __init__(self, rest, delay=DELETE_BATCH_DELAY):
+        self.rest = rest
+        self.delay = delay
+        self.pending = {}        # channel_id: {message_id: (message, future)}
+        self.flushing = set()    # Flush tasks in flight
+        self.stats = {
+            "deleted": 0,
+            "failed": 0,
+            "bulk_requests": 0,
+            "bulk_messages": 0,
+            "single_requests": 0,
+            "batches": 0,
+            "max_batch": 0,
+        }
+        self.batch_sizes = Histogram(BATCH_BUCKETS)  # Deletes collected per channel flush
+
+    def __len__(self):
+        return sum(len(batch) for batch in self.pending.values())
+
+    def delete(self, message):
+        loop = asyncio.get_running_loop()
+        channel = message.channel
+        batch = self.pending.get(channel.id)
+        if batch is None:
+            batch = self.pending[channel.id] = {}
+            loop.call_later(self.delay, self.start_flush, channel)
+
+        if message.id in batch:
+            return batch[message.id][1]
+
+        future = loop.create_future()
+        batch[message.id] = (message, future)
+        return future
+
+    def start_flush(self, channel):
+        task = asyncio.create_task(self.flush(channel))
+        self.flushing.add(task)
+        task.add_done_callback(self.flushing.discard)
+
+    async def flush(self, channel):
+        batch = list(self.pending.pop(channel.id, {}).values())
+        if not batch:
+            return
+
+        self.stats["batches"] += 1
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+        self.batch_sizes.observe(len(batch))
+
+        cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+        recent = [entry for entry in batch if entry[0].created_at > cutoff]
+        singles = [entry for entry in batch if entry[0].created_at <= cutoff]
+
+        if len(recent) > 1:
+            for start in range(0, len(recent), BULK_DELETE_MAX):
+                chunk = recent[start:start + BULK_DELETE_MAX]
+                if len(chunk) == 1:
+                    singles.extend(chunk)
+                    continue
+
+                messages = [message for message, _ in chunk]
+                result = await self.rest.run(
+                    ("bulk_delete", channel.id),
+                    lambda messages=messages: channel.delete_messages(messages)
+                )
+                self.stats["bulk_requests"] += 1
+                if not result.ok:
+                    singles.extend(chunk)  # e.g. one of them is gone already, retry one by one
+                    continue
+
+                self.stats["bulk_messages"] += len(chunk)
+                self.settle(chunk, result)
+        else:
+            singles.extend(recent)
+
+        results = await asyncio.gather(*(self.rest.delete_message(message) for message, _ in singles))
+        self.stats["single_requests"] += len(singles)
+        for entry, result in zip(singles, results):
+            self.settle([entry], result)
+
+    def settle(self, entries, result):
+        self.stats["deleted" if result.ok else "failed"] += len(entries)
+        for _, future in entries:
+            if not future.done():
+                future.set_result(result)
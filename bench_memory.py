@@ -0,0 +1,106 @@
+# Startup-to-ready time and RSS of the "lean" and "default" cache profiles (CACHE_PROFILE),
+# each measured in a fresh process against the real gateway.
+#
+#   python bench_memory.py [--seconds 120] [--profiles lean default]
+#
+# The bot is fully live while it is measured, so use a test bot token (BENCH_TOKEN, else TOKEN).
+
+# --- Standard library ---
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+STARTED = time.monotonic()
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except FileNotFoundError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+# --- Child: one profile, one process
+def measure(profile, seconds):
+    scratch = tempfile.mkdtemp(prefix="inari-bench-")
+    os.environ["CACHE_PROFILE"] = profile
+    os.environ["PORT"] = "0"
+    os.environ["CARD_CATALOG"] = os.path.join(scratch, "cards.db")
+    os.environ["JOBS_JOURNAL"] = os.path.join(scratch, "jobs.json")
+    os.environ["TIER_OVERRIDES"] = os.path.join(scratch, "tiers.json")
+    os.environ["THUMBNAIL_CACHE_DIR"] = os.path.join(scratch, "thumb_cache")
+
+    import bot
+
+    result = {"profile": profile, "rss_imported": rss_bytes()}
+    client = bot.client
+
+    async def on_ready():
+        if "ready_seconds" in result:
+            return  # Reconnect
+        result["ready_seconds"] = time.monotonic() - STARTED
+        result["rss_ready"] = rss_bytes()
+        await asyncio.sleep(seconds)  # Let regular traffic fill the caches
+
+        result["rss_after"] = rss_bytes()
+        result["cached_messages"] = len(client.cached_messages)
+        result["cached_members"] = sum(len(guild.members) for guild in client.guilds)
+        result["stored_messages"] = len(bot.message_store)
+        await client.close()
+
+    client.add_listener(on_ready)
+    client.run(os.getenv("BENCH_TOKEN") or os.getenv("TOKEN"), log_handler=None)
+    print(json.dumps(result))
+
+
+# --- Parent: run every profile and compare
+def compare(profiles, seconds):
+    results = []
+    for profile in profiles:
+        completed = subprocess.run(
+            [sys.executable, __file__, "--child", profile, "--seconds", str(seconds)],
+            capture_output=True, text=True,
+        )
+        lines = completed.stdout.strip().splitlines()
+        if completed.returncode != 0 or not lines:
+            print(f"{profile}: failed\n{completed.stderr}", file=sys.stderr)
+            continue
+        results.append(json.loads(lines[-1]))
+
+    mib = 1024 * 1024
+    print(f"{'profile':<10}{'ready s':>9}{'RSS import':>12}{'RSS ready':>11}{'RSS after':>11}"
+          f"{'messages':>10}{'members':>9}{'stored':>8}")
+    for row in results:
+        print(
+            f"{row['profile']:<10}{row.get('ready_seconds', float('nan')):>9.2f}"
+            f"{row['rss_imported'] / mib:>10.1f}Mi{row.get('rss_ready', 0) / mib:>9.1f}Mi"
+            f"{row.get('rss_after', 0) / mib:>9.1f}Mi{row.get('cached_messages', 0):>10}"
+            f"{row.get('cached_members', 0):>9}{row.get('stored_messages', 0):>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare RSS and startup-to-ready time of the cache profiles")
+    parser.add_argument("--profiles", nargs="+", default=["lean", "default"])
+    parser.add_argument("--seconds", type=int, default=120, help="traffic to sit through after on_ready")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args.child, args.seconds)
+    else:
+        compare(args.profiles, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
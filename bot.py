@@ -1,27 +1,94 @@
 # --- Standard library ---
 import os
-import re
 import asyncio
 import datetime
+import io
+import logging
 import random
+import time
+from collections import OrderedDict
+from types import MappingProxyType
 
 # --- Third-party packages ---
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
 
+# --- Local modules ---
+from actions import MAX_RATE_LIMIT_WAIT, DeleteBatcher, RestActions
+from cache import CardCache
+from catalog import CardCatalog
+from digest import WarningDigest
+from expiry import ThreadExpiryIndex
+from guilds import GuildDirectory, compile_guild, load_guild_configs
+from jobs import JobScheduler
+from message_store import MessageStore
+from metrics import GatewayHealth, LoopLagMonitor, MetricsWriter, RateLimitLog
+from parsers import LabelledParser, NairiParser, ParserRegistry, parse_collection_codes
+from replies import PendingReplies
+from sessions import SessionStore
+from tiers import TierClassifier
+from timers import TimerWheel
+from web import WebServer
+from router import CommandRouter
+
 # --- Load environment variables
 load_dotenv()
 
 # --- Discord setup
-intents = discord.Intents.default()
+# "lean" keeps only what Inari reads: no member cache, no guild chunking, no
+# discord.py message deque (see message_store) and only the intents handlers use.
+# "default" is discord.py's stock caching, kept for comparison (bench_memory.py).
+CACHE_PROFILE = os.getenv("CACHE_PROFILE", "lean")
+
+if CACHE_PROFILE == "default":
+    intents = discord.Intents.default()
+    client_options = {}
+else:
+    intents = discord.Intents.none()
+    intents.guilds = True  # Channels and threads
+    client_options = {
+        "member_cache_flags": discord.MemberCacheFlags.none(),
+        "chunk_guilds_at_startup": False,
+        "max_messages": None,
+    }
 intents.message_content = True
 intents.reactions = True
 intents.messages = True
 
-client = commands.Bot(command_prefix="!", intents=intents)
+# Sharded so several trading servers spread over gateway connections.
+# Everything started in setup_hook shares the bot's loop, so close() stops it before the
+# gateway closes: web server, scheduled jobs and background tasks, then the catalog
+# writes what is still queued and the tier classifier closes its HTTP session.
+class InariBot(commands.AutoShardedBot):
+    # Runs once per process, unlike on_ready which fires again on every reconnect
+    async def setup_hook(self):
+        workers = [auto_thread_worker() for _ in range(THREAD_WORKERS)] if AUTO_THREAD_ENABLED else []
+        for coroutine in workers + [expiry_index.run(), card_catalog.run(), loop_monitor.run(), timers.run()]:
+            background_tasks.append(self.loop.create_task(coroutine))
+        job_scheduler.start()
+        if WEB_PORT:
+            await web_server.start()
+
+    async def close(self):
+        await web_server.stop()
+        job_scheduler.stop()
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        background_tasks.clear()
+        await card_catalog.close()
+        await tier_classifier.close()
+        await super().close()
+
+background_tasks = []  # Started in setup_hook, cancelled in InariBot.close
+
+client = InariBot(command_prefix="!", intents=intents, max_ratelimit_timeout=MAX_RATE_LIMIT_WAIT, **client_options)
+actions = RestActions()  # Outbound REST actions, failures come back as ActionResult
+deletes = DeleteBatcher(actions)  # Per-channel bulk deletes for enforcement and thread notices
 
 # --- Variables declaration
+# Home server configuration; more servers can be added through GUILDS_CONFIG
 WHITELISTED_USERS = {
     # 319894559880511499, # Boost
     360651722781097984, # Rain
@@ -39,6 +106,7 @@ WHITELISTED_USERS = {
 }
 NAIRI_BOT_ID = 1312830013573169252 # Nairi bot ID
 SOFI_BOT_ID = 853629533855809596 # Sofi bot ID
+CARD_BOT_IDS = frozenset({NAIRI_BOT_ID, SOFI_BOT_ID})  # Bots whose card embeds are parsed and stored
 SERVER_ID = 938644623394492428 # Server ID
 # SERVER_ID = 866730377258074152 # Test server ID
 WARNING_CHANNEL_ID = 1373574689682751560  # Nairi-market-warn
@@ -120,147 +188,332 @@ PRINT_RANGES = {
     },
 }
 LUVI_RAID_CHANNEL_ID = 1532296462682292355
+AUC_HELP_CHANNEL_ID = 1348292826609221642
+GUILDS_CONFIG_PATH = os.getenv("GUILDS_CONFIG", "guilds.json")  # Extra servers, a JSON list of guild configs
+
+HOME_GUILD = compile_guild(
+    SERVER_ID,
+    warning_channel_id=WARNING_CHANNEL_ID,
+    auc_help_channel_id=AUC_HELP_CHANNEL_ID,
+    whitelisted_users=WHITELISTED_USERS,
+    nairi_auction_channel_ids=NAIRI_AUTO_CLOSE_THREAD_CHANNEL_IDS,
+    sofi_auction_channel_ids=SOFI_AUTO_CLOSE_THREAD_CHANNEL_IDS,
+    luvi_auction_channel_ids=LUVI_AUTO_CLOSE_THREAD_CHANNEL_IDS,
+    raid_channel_ids={LUVI_RAID_CHANNEL_ID},
+    print_ranges=PRINT_RANGES,
+)
+# Every configured server compiled into frozen channel → guild tables
+guild_directory = GuildDirectory([HOME_GUILD] + load_guild_configs(GUILDS_CONFIG_PATH))
 RAID_TIMER = 300
-MESSAGE_TIMEOUT = 60  # seconds
+RAID_REFRESH_INTERVAL = 2  # seconds between raid embed edits, clicks in between are shown together
+RAID_ORDER_INLINE_MAX = 1900  # characters of raid order posted inline, longer orders are attached as a .txt file
+EMBED_FIELD_VALUE_MAX = 1024  # Discord embed limits
+EMBED_FIELDS_MAX = 25
+EMBED_TOTAL_MAX = 6000
+MESSAGE_TIMEOUT = 60  # seconds a 📝 code copy session follows nc page edits after its last activity
+CODE_COPY_EMOJI = "📝"
+CODE_COPY_INLINE_MAX = 1900  # characters of codes posted inline, longer lists are attached as a .txt file
+NC_COMMANDS = ("nc", "ncollection")
+CARD_VIEW_COMMANDS = {NAIRI_BOT_ID: ("nv", "nview"), SOFI_BOT_ID: ("sv", "sview")}  # Card bot: its view commands
+REPLY_TIMEOUT = 15  # seconds to wait for Nairi's reply to an nv and the embed on it
+THREAD_WORKERS = int(os.getenv("THREAD_WORKERS", "4"))  # Concurrent workers for %nthread / %sthread / %lthread
+THREAD_SCAN_LIMIT = 25  # Messages scanned per channel
+THREAD_SCAN_MAX_AGE_HOURS = 21  # Ignore auction posts older than this
+AUTO_THREAD_ENABLED = os.getenv("AUTO_THREAD", "0") == "1"  # Thread auction posts as they arrive
+CARD_CACHE_MAX_ENTRIES = int(os.getenv("CARD_CACHE_MAX_ENTRIES", "5000"))
+CARD_CACHE_MAX_BYTES = int(os.getenv("CARD_CACHE_MAX_BYTES", str(4 * 1024 * 1024)))  # Memory ceiling for parsed cards
 MIN_THREAD_AGE_HOURS = 20 # 20 hours for actual
 # MIN_THREAD_AGE_HOURS = 0.25 # 15 minutes for testing
 # MIN_THREAD_AGE_HOURS = 0.001 # 3.6 seconds for testing
+THREAD_CLOSE_WORKERS = 4  # Threads locked concurrently when deadlines coincide
+PENDING_THREAD_NOTICES_MAX = 500  # Threads remembered while their "started a thread" notice is in flight
+ACTIVE_THREADS_SNAPSHOT_TTL = 300  # seconds an active_threads() snapshot is reused
+WARNING_DIGEST_WINDOW = float(os.getenv("WARNING_DIGEST_WINDOW", "2"))  # seconds warnings are merged into one digest
+WARNING_DEDUP_SECONDS = int(os.getenv("WARNING_DEDUP_SECONDS", "600"))  # Same user + card is warned once per period
+TIER_OVERRIDES_PATH = os.getenv("TIER_OVERRIDES", "tiers.json")  # Tiers registered at runtime with %tier
+THUMBNAIL_CACHE_DIR = os.getenv("THUMBNAIL_CACHE_DIR", "thumb_cache")
+THUMBNAIL_CACHE_MAX_BYTES = int(os.getenv("THUMBNAIL_CACHE_MAX_BYTES", str(20 * 1024 * 1024)))
+JOBS_JOURNAL_PATH = os.getenv("JOBS_JOURNAL", "jobs.json")  # Last run of each scheduled job, survives restarts
+WEB_PORT = int(os.getenv("PORT", "8080"))  # Keepalive / health / metrics endpoint, 0 disables it
+CARD_CATALOG_PATH = os.getenv("CARD_CATALOG", "cards.db")  # Every parsed card by code, for %auc <code>
 
 # Mappings
-user_card_codes = {}           # user_id: list of card codes
-message_user_map = {}          # message_id: user_id
-user_response_message = {}     # user_id: response message
-user_wants_to_copy = {}        # user_id: bool
-active_raids = {}              # RaidSession
+pending_thread_notices = OrderedDict()  # thread id (= starter message id): channel id, awaiting its notice
+auto_thread_queue = asyncio.Queue()  # (channel, message, make_thread) waiting for a thread
+
+# Card parsers by source bot; forwarded Luvi posts are parsed from their message snapshots
+card_parsers = ParserRegistry(
+    {
+        NAIRI_BOT_ID: NairiParser(),
+        SOFI_BOT_ID: LabelledParser("sofi"),
+    },
+    forwarded=LabelledParser("luvi"),
+)
+tier_classifier = TierClassifier(
+    TIER_OVERRIDES_PATH, THUMBNAIL_CACHE_DIR, THUMBNAIL_CACHE_MAX_BYTES,
+    rule_tiers=(tier for config in guild_directory for rule in config.rules.rules.values() for tier in rule.tiers),
+)
+card_cache = CardCache(CARD_CACHE_MAX_ENTRIES, CARD_CACHE_MAX_BYTES)  # message_id: CardRecord
+card_catalog = CardCatalog(CARD_CATALOG_PATH)  # code: CardRecord, on disk
+router = CommandRouter()  # on_message dispatch table, frozen once every handler is registered
+job_scheduler = JobScheduler(JOBS_JOURNAL_PATH)  # Cron-style SGT jobs, one timer each
+timers = TimerWheel()  # Session TTLs, reply timeouts and raid deadlines, driven by one task
+pending_replies = PendingReplies(timers)  # (channel_id, user message id): waiter for Nairi's reply
+copy_sessions = SessionStore(MESSAGE_TIMEOUT, timers)  # user_id ↔ nc message id: CodeCopySession
 
 # --- Methods declaration
-# Cleanup function
-def clear_user_data(user_id):
-    user_card_codes.pop(user_id, None)
-    user_response_message.pop(user_id, None)
-    user_wants_to_copy.pop(user_id, None)
-    for message_id in list(message_user_map):
-        if message_user_map[message_id] == user_id:
-            del message_user_map[message_id]
-
-# Timeout-based cleanup
-async def expire_user_mapping(user_id, delay):
-    await asyncio.sleep(delay)
-    clear_user_data(user_id)
-
-# Extract card info
-def parse_description_for_card_info(description):
-    lines = description.splitlines()
-
-    # --- SERIES (line 0)
-    series = lines[0].strip("* ") if len(lines) > 0 else "Unknown"
-
-    # --- CARD + PRINT (line 1)
-    card_code = "Unknown"
-    card_print = "Unknown"
-
-    if len(lines) > 1:
-        card_match = re.search(r"`([A-Z0-9]+)`\s*·\s*`([^`]+)`", lines[1])
-        if card_match:
-            card_code = card_match.group(1)
-            raw_print = card_match.group(2)
-
-            # Normalize only if it's P-XXX
-            match = re.fullmatch(r"P-(\d+)", raw_print, re.IGNORECASE)
-            if match:
-                card_print = f"P{match.group(1)}"
-            else:
-                card_print = raw_print
-
-    # --- OWNER (line 2)
-    owner_mention = "Unknown"
-
-    if len(lines) > 2:
-        owner_match = re.search(r"<@!?(\d+)>", lines[2])
-        if owner_match:
-            owner_mention = f"<@{owner_match.group(1)}>"
-
-    return series, card_code, card_print, owner_mention
-
-# Extract card tier
-def get_card_tier_from_embed(embed):
-    TIER_PLACEHOLDER_MAP = {
-        "8ReCBQIkKejmCJuYe19FrwU6B3iHeIl3Zw==": "T1",
-        "8veBBQAkJ7rYGK2XDXeYb5b5B2iHeIl3WA==": "T2",
-        "cgiCBQAkSsTJFnWM+Gdm0ICjB3iIZ4Z5lw==": "Smr25",
-        "rTiCDQIkaobZB461lndnYHcGB3iIZ4Z5lw==": "Smr26",
-        "KymCDQAkGfm6N4Scl2dnYF9FB2iHZ4Z5lw==": "Xmas25",
-        "b1iCBQIkOceaVpCNynZ2YGcHB3iIZ4Z5pw==": "Val26",
-        "7GiCDQQkiFe5No9jeHdmcGQHB3iHaIaJlw==": "Skr26",
-    }
-
-    placeholder = ""
-    if embed.thumbnail and hasattr(embed.thumbnail, "placeholder"):
-        placeholder = embed.thumbnail.placeholder
-
-    return TIER_PLACEHOLDER_MAP.get(placeholder, "")  # Default to "" if unknown
-
-# Extract the user's name or user ID
-def extract_owner_and_mention(embed):
-    owner_mention = None
+# Warnings go out as merged digests in each server's market-warn channel
+async def send_warning(config, content):
+    warning_channel = client.get_channel(config.warning_channel_id) if config.warning_channel_id else None
+    if warning_channel:
+        await actions.send(warning_channel, content)
+
+# Recent card bot messages and forwarded auction posts, for lookups without a REST fetch
+message_store = MessageStore(guild_directory.by_channel)
+
+def is_stored_message(message):
+    if message.author.id in CARD_BOT_IDS:
+        return bool(message.embeds)
+    return bool(getattr(message, "message_snapshots", None)) and message.channel.id in guild_directory.auction_channel_ids
+
+# Mutable state of one configured server
+class GuildState:
+    def __init__(self, config):
+        self.config = config
+        self.raids = {}                 # channel_id: RaidSession
+        self.threads_snapshot = None    # (time.monotonic(), threads) from the last guild.active_threads()
+        self.warnings = WarningDigest(
+            lambda content: send_warning(config, content),
+            WARNING_DIGEST_WINDOW,
+            WARNING_DEDUP_SECONDS,
+        )
 
-    # 1. Check the description first (if it's not None)
-    if embed.description:
-        match = re.search(r"<@!?(\d+)>", embed.description)
-        if match:
-            owner_mention = f"<@{match.group(1)}>"  # Return the user mention if found
+guild_states = MappingProxyType({config.guild_id: GuildState(config) for config in guild_directory})
+channel_states = MappingProxyType({
+    channel_id: guild_states[config.guild_id] for channel_id, config in guild_directory.by_channel.items()
+})
+
+# Server whose configuration applies to a message: its channel if configured, else its guild
+def guild_state(message):
+    state = channel_states.get(message.channel.id)
+    if state is None and message.guild is not None:
+        state = guild_states.get(message.guild.id)
+    return state
+
+# Parse a card message once; enforcement, %auc and thread creation share the result
+def get_card(message):
+    card = card_cache.get(message.id)
+    if card is None:
+        card = card_parsers.parse_message(message)
+        if card is not None:
+            card_cache.put(message.id, card)
+    return card
+
+# A card bot's reply to its view command (Nairi nv / nview, Sofi sv / sview). Only these
+# are catalogued: other embeds (nc pages, auction posts) share parts of the layout but
+# not the meaning.
+def is_card_view(message):
+    commands = CARD_VIEW_COMMANDS.get(message.author.id)
+    if commands is None or not message.embeds or not message.reference:
+        return False
+    request = getattr(message.reference.resolved, "content", None)  # None when deleted or not resolved
+    parts = request.strip().lower().split() if request else []
+    return bool(parts) and parts[0] in commands
+
+def catalog_card_view(message):
+    if is_card_view(message):
+        card_catalog.add(get_card(message), message)
+
+# Same as get_card, but an unknown tier goes through the fallback classifier
+async def get_classified_card(message):
+    card = get_card(message)
+    if card is None or not message.embeds:
+        return card
+    if card.tier:
+        tier_classifier.learn(message.embeds[0], card.tier)  # Hash icon for cards with unknown placeholders
+        return card
+
+    tier = await tier_classifier.classify(message.embeds[0])
+    if tier:
+        card = card._replace(tier=tier)
+        card_cache.put(message.id, card)
+        catalog_card_view(message)
+    return card
+
+# Public thread on an auction post, remembered so its "started a thread" notice is removed
+async def create_auction_thread(channel, message, card_name):
+    # A thread started from a message shares its id, so the "started a thread" notice can
+    # be matched as soon as the gateway delivers it (see is_removable_thread_notice)
+    pending_thread_notices[message.id] = channel.id
+    while len(pending_thread_notices) > PENDING_THREAD_NOTICES_MAX:
+        pending_thread_notices.popitem(last=False)
+
+    result = await actions.create_thread(channel, message, card_name)
+    if not result.ok:
+        pending_thread_notices.pop(message.id, None)
+    return result
+
+# --- DELETE "X started a thread" system messages in auction channels ---
+def is_removable_thread_notice(message):
+    if message.channel.id not in guild_directory.auction_channel_ids:
+        return False
+
+    thread_id = message.reference.channel_id if message.reference else None
+    if pending_thread_notices.pop(thread_id, None) is not None:
+        return True  # Thread created by Inari
+
+    return message.author == client.user or message.channel.id in guild_directory.luvi_auction_channel_ids
+
+# --- Thread creation pipeline
+# History scans run in parallel across channels, and a bounded pool of workers
+# creates the threads, with no fixed sleep between them (see RestActions).
+async def run_thread_pipeline(channel_ids, is_candidate, make_thread):
+    started = time.monotonic()
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=THREAD_SCAN_MAX_AGE_HOURS)
+    stats = {"created": 0, "skipped": 0, "failed": 0, "scan_failed": 0}
+    queue = asyncio.Queue()
+    scan_slots = asyncio.Semaphore(THREAD_WORKERS)
+
+    async def scan(channel):
+        async with scan_slots:
+            async for msg in channel.history(limit=THREAD_SCAN_LIMIT):
+                if msg.created_at <= cutoff or not is_candidate(msg):
+                    continue
 
-    # 2. If no owner mention found in the description, check the embed fields
-    if not owner_mention:  # Only check fields if no owner was found in the description
-        for field in embed.fields:
-            match = re.search(r"<@!?(\d+)>", field.value)
-            if match:
-                owner_mention = f"<@{match.group(1)}>"  # Return the user mention from field value if found
+                if msg.thread is not None:
+                    stats["skipped"] += 1  # Already has an auction thread
+                    continue
 
-    return owner_mention
+                await queue.put((channel, msg))
 
-# Thread creation to handle rate limit 
-async def create_thread_with_rate_limit(channel, message, card_name):
+    async def worker():
+        while True:
+            channel, msg = await queue.get()
+            try:
+                result = await make_thread(channel, msg)
+                stats["created" if result.ok else "failed"] += 1
+            except Exception:
+                stats["failed"] += 1
+            finally:
+                queue.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(THREAD_WORKERS)]
     try:
-        thread = await channel.create_thread(
-            name=card_name,
-            message=message,
-            type=discord.ChannelType.public_thread
-        )
+        channels = [client.get_channel(channel_id) for channel_id in channel_ids]
+        results = await asyncio.gather(*(scan(channel) for channel in channels if channel), return_exceptions=True)
+        # Unavailable channels and scans that raised (e.g. Forbidden on history) are reported, not dropped
+        stats["scan_failed"] = channels.count(None) + sum(isinstance(result, Exception) for result in results)
+        await queue.join()
+    finally:
+        for task in workers:
+            task.cancel()
+
+    return stats, time.monotonic() - started
+
+# Auction posts that get a thread
+def is_nairi_auction_post(msg):
+    return msg.author.id == NAIRI_BOT_ID and bool(msg.embeds)
+
+def is_sofi_auction_post(msg):
+    return msg.author.id == SOFI_BOT_ID and bool(msg.embeds)
+
+def is_luvi_auction_post(msg):
+    return bool(getattr(msg, "message_snapshots", None))
+
+# Nairi/Sofi auction post → thread named after the card, with the owner pinged inside
+async def create_card_thread(channel, bot_msg):
+    card = get_card(bot_msg)
+
+    result = await create_auction_thread(channel, bot_msg, card.name)
+    if result.ok and card.owner_id:
+        await actions.send(result.value, card.owner_mention)  # Mention the user directly
+    return result
+
+# Luvi auction post (forwarded message) → thread named after the forwarded card
+async def create_forwarded_thread(channel, forwarded_msg):
+    card = get_card(forwarded_msg)
+    card_name = card.name if card and card.name != "Unknown" else "-"
+
+    result = await create_auction_thread(channel, forwarded_msg, card_name)
+    if result.ok and card and card.owner_id:
+        await actions.send(result.value, card.owner_mention)
+    return result
+
+# --- Auto-threading: auction posts are queued from on_message as they arrive
+def get_auto_thread_route(channel_id):
+    if channel_id in guild_directory.nairi_auction_channel_ids:
+        return is_nairi_auction_post, create_card_thread
+    if channel_id in guild_directory.sofi_auction_channel_ids:
+        return is_sofi_auction_post, create_card_thread
+    if channel_id in guild_directory.luvi_auction_channel_ids:
+        return is_luvi_auction_post, create_forwarded_thread
+    return None
+
+async def auto_thread_worker():
+    while True:
+        channel, msg, make_thread = await auto_thread_queue.get()
+        try:
+            await make_thread(channel, msg)
+        except Exception:
+            pass
+        finally:
+            auto_thread_queue.task_done()
+
+async def send_thread_summary(channel, stats, elapsed):
+    await actions.send(
+        channel,
+        f"Created **{stats['created']}** threads, skipped **{stats['skipped']}**"
+        + (f", failed **{stats['failed']}**" if stats["failed"] else "")
+        + (f", could not scan **{stats['scan_failed']}** channels" if stats["scan_failed"] else "")
+        + f" in {elapsed:.1f}s."
+    )
 
-        # --- DELETE "Inari started a thread" system message ---
-        async for msg in channel.history(limit=5):
-            if (
-                msg.type == discord.MessageType.thread_created
-                and msg.author == client.user
-            ):
-                try:
-                    await msg.delete()
-                except discord.Forbidden:
-                    pass
+# Numbered participant fields that always fit Discord's embed limits: lines fill
+# fields of up to EMBED_FIELD_VALUE_MAX characters until `budget` (what is left of
+# EMBED_TOTAL_MAX) or EMBED_FIELDS_MAX runs out, and the rest is summarised as
+# "… and N more". Rendering stops there, so huge rosters cost no more than a full embed.
+def participant_fields(members, count, budget):
+    name = f"Participants ({count})"
+    reserve = len(f"\n… and {count} more")  # Room kept for the summary line
+    budget -= len(name) + reserve
+    fields = [(name, [])]
+    size = 0
+    shown = 0
+
+    for i, member in enumerate(members, 1):
+        line = f"{i}. {member.display_name}"
+        if size + len(line) + 1 > EMBED_FIELD_VALUE_MAX - reserve:
+            if len(fields) == EMBED_FIELDS_MAX or budget < len(line) + 1:
                 break
+            fields.append(("\u200b", []))  # Continuation field, blank name
+            budget -= 1
+            size = 0
+        if budget < len(line) + 1:
+            break
+        fields[-1][1].append(line)
+        size += len(line) + 1
+        budget -= len(line) + 1
+        shown += 1
 
-        return thread
-
-    except discord.errors.HTTPException as e:
-        if e.code == 429:  # Rate-limited
-            retry_after = e.retry_after  # Discord will send how long to wait before retrying
-            await asyncio.sleep(retry_after)
-            return await create_thread_with_rate_limit(channel, message, card_name)  # Retry
+    if shown < count:
+        fields[-1][1].append(f"… and {count - shown} more")
+    return [(name, "\n".join(lines)) for name, lines in fields]
 
 class RaidSession:
     def __init__(self, owner):
         self.owner = owner
-        self.members = []
+        self.members = {}  # user_id: member, in join order
         self.message = None
         self.view = None
         self.ended = False
         self.end_time = discord.utils.utcnow() + datetime.timedelta(seconds=RAID_TIMER)
-        self.task = None
+        self.timer = None  # Deadline on the timer wheel, fires RaidView.on_timeout
+        self.refresh = None  # Pending embed edit on the timer wheel, fires RaidView.refresh
+        self.refreshed_at = 0.0
 
 class RaidView(discord.ui.View):
     def __init__(self, session):
-        super().__init__(timeout=RAID_TIMER)
+        super().__init__(timeout=None)  # Ends at session.end_time, not RAID_TIMER after the last click
         self.session = session
 
     def make_embed(self):
@@ -275,39 +528,52 @@ class RaidView(discord.ui.View):
             color=discord.Color.gold()
         )
 
-        if self.session.members:
-            participants = "\n".join(
-                f"{i}. {member.display_name}"
-                for i, member in enumerate(self.session.members, 1)
-            )
-        else:
-            participants = "Nobody yet."
+        if not self.session.members:
+            embed.add_field(name="Participants (0)", value="Nobody yet.", inline=False)
+            return embed
 
-        embed.add_field(
-            name=f"Participants ({len(self.session.members)})",
-            value=participants,
-            inline=False
-        )
+        fields = participant_fields(self.session.members.values(), len(self.session.members), EMBED_TOTAL_MAX - len(embed))
+        for name, value in fields:
+            embed.add_field(name=name, value=value, inline=False)
 
         return embed
 
+    # Clicks change the roster at once but only schedule an edit: the embed is redrawn
+    # with the latest roster at most once per RAID_REFRESH_INTERVAL.
+    def schedule_refresh(self):
+        if self.session.refresh is not None or self.session.ended:
+            return
+        delay = self.session.refreshed_at + RAID_REFRESH_INTERVAL - time.monotonic()
+        self.session.refresh = timers.schedule(max(0.0, delay), self.refresh)
+
+    async def refresh(self):
+        self.session.refresh = None
+        if self.session.ended:
+            return
+        self.session.refreshed_at = time.monotonic()
+        await actions.edit_message(self.session.message, embed=self.make_embed(), view=self)
+
     async def finish(self):
         if self.session.ended:
             return
 
         self.session.ended = True
+        timers.cancel(self.session.timer)
+        timers.cancel(self.session.refresh)  # The final edit below shows the latest roster
+        self.session.refresh = None
 
         for item in self.children:
             item.disabled = True
 
-        await self.session.message.edit(
+        await actions.edit_message(
+            self.session.message,
             embed=self.make_embed(),
             view=self
         )
 
         self.stop()
 
-        members = self.session.members.copy()
+        members = list(self.session.members.values())
         random.shuffle(members)
 
         lines = [f"{self.session.owner.mention} - Host"]
@@ -318,11 +584,22 @@ class RaidView(discord.ui.View):
             else:
                 lines.append(f"{member.display_name} - {i}")
 
-        await self.session.message.reply(
-            "**Raid Order**\n\n" + "\n".join(lines)
-        )
+        order = "\n".join(lines)
+        if len(order) <= RAID_ORDER_INLINE_MAX:
+            await actions.reply(self.session.message, "**Raid Order**\n\n" + order)
+        else:
+            # The host and top 4 are still pinged, the whole order goes in the file
+            full_order = "\n".join(
+                [f"{self.session.owner.display_name} - Host"]
+                + [f"{member.display_name} - {i}" for i, member in enumerate(members, start=1)]
+            )
+            await actions.reply(
+                self.session.message,
+                "**Raid Order** (full order attached)\n\n" + "\n".join(lines[:5]),
+                file=discord.File(io.BytesIO(full_order.encode()), filename="raid_order.txt")
+            )
 
-        active_raids.pop(
+        channel_states[self.session.message.channel.id].raids.pop(
             self.session.message.channel.id,
             None
         )
@@ -343,16 +620,14 @@ class RaidView(discord.ui.View):
             await interaction.response.defer()
             return
 
-        if interaction.user in self.session.members:
+        if interaction.user.id in self.session.members:
             await interaction.response.defer()
             return
 
-        self.session.members.append(interaction.user)
+        self.session.members[interaction.user.id] = interaction.user
 
-        await interaction.response.edit_message(
-            embed=self.make_embed(),
-            view=self
-        )
+        self.schedule_refresh()
+        await interaction.response.defer()
 
     @discord.ui.button(
         label="Leave",
@@ -367,16 +642,14 @@ class RaidView(discord.ui.View):
             await interaction.response.defer()
             return
 
-        if interaction.user not in self.session.members:
+        if interaction.user.id not in self.session.members:
             await interaction.response.defer()
             return
 
-        self.session.members.remove(interaction.user)
+        del self.session.members[interaction.user.id]
 
-        await interaction.response.edit_message(
-            embed=self.make_embed(),
-            view=self
-        )
+        self.schedule_refresh()
+        await interaction.response.defer()
 
     @discord.ui.button(
         label="End",
@@ -395,338 +668,273 @@ class RaidView(discord.ui.View):
         await self.finish()
 
 @client.event
-async def on_thread_create(thread: discord.Thread):
-    # Only apply to Luvi auction channels
-    if thread.parent_id not in LUVI_AUTO_CLOSE_THREAD_CHANNEL_IDS:
-        return
+async def on_thread_update(before: discord.Thread, after: discord.Thread):
+    expiry_index.track(after)  # Drops the thread once it is locked or archived
 
-    channel = thread.parent
-    if not channel:
-        return
+@client.event
+async def on_thread_delete(thread: discord.Thread):
+    expiry_index.discard(thread.id)
 
-    # Look for the system message "X started a thread"
-    async for msg in channel.history(limit=5):
-        if (
-            msg.type == discord.MessageType.thread_created
-            and msg.reference
-            and msg.reference.channel_id == thread.id
-        ):
-            try:
-                await msg.delete()
-            except discord.Forbidden:
-                pass
-            break
+@client.event
+async def on_thread_create(thread: discord.Thread):
+    expiry_index.track(thread)
 
 @client.event
-async def on_message(message):
-    if message.author == client.user:
+async def on_raw_message_edit(payload):
+    card_cache.invalidate(payload.message_id)  # Embed may have changed, parse again next time
+    message_store.update(payload.message)
+    if payload.message.author.id == NAIRI_BOT_ID:
+        pending_replies.feed(payload.message)  # Others' edits (e.g. link previews) must not resolve a waiter
+    catalog_card_view(payload.message)  # Nairi adds the card embed by editing its reply
+    await follow_collection_page(payload)
+
+@client.event
+async def on_raw_message_delete(payload):
+    card_cache.invalidate(payload.message_id)
+    message_store.discard(payload.channel_id, payload.message_id)
+
+# --- on_message routing
+# Every handler takes (message, content) where content is the stripped, lower-cased text.
+
+# --- Feature 6: %threadcreate ---
+# Check if the message is from a whitelisted user and starts with the command
+@router.prefix("thread_command", "%nthread", "%sthread")
+async def handle_thread_command(message, content):
+    state = guild_state(message)
+    if state is None or message.author.id not in state.config.whitelisted_users:
         return
 
-    content = message.content.strip().lower()
-    # --- Feature 6: %threadcreate ---
-    # Check if the message is from a whitelisted user and starts with the command
-    if content.lower().startswith("%sthread") or content.lower().startswith("%nthread"):
-        if message.author.id not in WHITELISTED_USERS:
-            return
+    # Determine which bot and channels to use based on the command
+    if content.startswith("%nthread"):
+        is_candidate = is_nairi_auction_post
+        channel_ids = state.config.nairi_auction_channel_ids
+    else:
+        is_candidate = is_sofi_auction_post
+        channel_ids = state.config.sofi_auction_channel_ids
+
+    stats, elapsed = await run_thread_pipeline(channel_ids, is_candidate, create_card_thread)
+    await send_thread_summary(message.channel, stats, elapsed)
+
+# --- Feature 7: %threadcreate ---
+# Check if the message is from a whitelisted user and starts with the command
+@router.prefix("luvi_thread_command", "%lthread")
+async def handle_luvi_thread_command(message, content):
+    state = guild_state(message)
+    if state is None or message.author.id not in state.config.whitelisted_users:
+        return
 
-        # Determine which bot and channels to use based on the command
-        if content.lower().startswith("%nthread"):
-            target_bot_id = NAIRI_BOT_ID
-            channel_ids = NAIRI_AUTO_CLOSE_THREAD_CHANNEL_IDS
-        else:
-            target_bot_id = SOFI_BOT_ID
-            channel_ids = SOFI_AUTO_CLOSE_THREAD_CHANNEL_IDS
-        
-        # Fetch all the relevant channels
-        for channel_id in channel_ids:
-            channel = client.get_channel(channel_id)
-
-            if not channel:
-                continue  # Skip if the channel is not available
-
-            # Fetch recent messages from the target bot in the current channel
-            target_bot_messages = []
-            async for msg in channel.history(limit=25):
-                target_bot_messages.append(msg)
-
-            target_bot_messages = [
-                msg for msg in target_bot_messages
-                if msg.author.id == target_bot_id and msg.created_at > datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=21)
-            ]
-
-            if not target_bot_messages:
-                continue  # Skip to the next channel if no valid messages are found
-
-            # Loop through the bot's recent messages to find an appropriate one for creating a thread
-            for bot_msg in target_bot_messages:
-                if bot_msg.embeds:
-                    embed = bot_msg.embeds[0]
-                    card_owner_mention = extract_owner_and_mention(embed)
-                    card_name = embed.title or "Unknown"
-
-                    if bot_msg.thread is not None:
-                        continue
-
-                    try:
-                        thread = await create_thread_with_rate_limit(channel, bot_msg, card_name)
-                        # Ping the card owner in the thread
-                        await thread.send(f"{card_owner_mention}")  # Mention the user directly
-                        await asyncio.sleep(1)  # Add a 1-second delay between creating threads
-                    except Exception as e:
-                        pass
+    # Luvi auctions are forwarded messages, so look for message snapshots instead of embeds
+    stats, elapsed = await run_thread_pipeline(
+        state.config.luvi_auction_channel_ids,
+        is_luvi_auction_post,
+        create_forwarded_thread,
+    )
+    await send_thread_summary(message.channel, stats, elapsed)
+
+# --- Feature 9: auto-threading of auction posts ---
+async def handle_auction_post(message, content):
+    is_candidate, make_thread = get_auto_thread_route(message.channel.id)
+    if is_candidate(message) and message.thread is None:
+        auto_thread_queue.put_nowait((message.channel, message, make_thread))
+
+if AUTO_THREAD_ENABLED:
+    router.channel("auto_thread", guild_directory.auction_channel_ids)(handle_auction_post)
+
+# --- Feature 1: %auc reply parser ---
+def auc_help(message):
+    state = guild_state(message)
+    if state and state.config.auc_help_channel_id:
+        return f"read <#{state.config.auc_help_channel_id}> on how to use `%auc`"
+    return "Reply to Nairi's card with `%auc <preference>`, or use `%auc <card code> <preference>`."
+
+def format_auction(card, preference):
+    return (
+        f"Card Code: {card.code}\n"
+        f"{card.card_print} • {card.name} • {card.series} [ {card.tier} ]\n"
+        f"Owned By: {card.owner_mention}\n"
+        f"Preference: {preference}"
+    )
 
-        return
-    # --- Feature 7: %threadcreate ---
-    # Check if the message is from a whitelisted user and starts with the command
-    if content.lower().startswith("%lthread"):
-        if message.author.id not in WHITELISTED_USERS:
+def parse_preference(raw_pref):
+    emoji_map = {
+        ":jades:": "<:jades:1351944414104129599>",
+    }
+
+    if not raw_pref:
+        return "<:jades:1351944414104129599>"
+    for alias, full in emoji_map.items():
+        raw_pref = raw_pref.replace(alias, full)
+    return raw_pref.strip()
+
+@router.prefix("auc", "%auc")
+async def handle_auc(message, content):
+    original = message.reference.resolved if message.reference else None
+
+    if not isinstance(original, discord.Message):
+        # `%auc <code> [preference]` is answered from the catalog of Nairi card views, no fetch needed
+        command_parts = content.split(maxsplit=2)
+        card = card_catalog.get("nairi", command_parts[1]) if len(command_parts) > 1 else None
+        if card is None or card.tier == "":
+            await actions.send(message.channel, auc_help(message))
             return
 
-        # Determine which channels to use based on the command
-        channel_ids = LUVI_AUTO_CLOSE_THREAD_CHANNEL_IDS
-        
-        # Fetch all the relevant channels
-        for channel_id in channel_ids:
-            channel = client.get_channel(channel_id)
+        preference = parse_preference(command_parts[2] if len(command_parts) > 2 else "")
+        await actions.send(message.channel, format_auction(card, preference))
+        return
 
-            if not channel:
-                continue  # Skip if the channel is not available
+    if original.author.id != NAIRI_BOT_ID or not original.embeds:
+        await actions.send(message.channel, auc_help(message))
+        return
 
-            # Fetch recent forwarded messages in the current channel
-            target_messages = []
-            async for msg in channel.history(limit=25):
-                target_messages.append(msg)
+    command_parts = content.split(maxsplit=1)
+    preference = parse_preference(command_parts[1] if len(command_parts) > 1 else "")
 
-            target_messages = [
-                msg for msg in target_messages
-                if getattr(msg, "message_snapshots", None) and msg.created_at > datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=21)
-            ]
+    # Extract card info
+    card = await get_classified_card(original)
 
-            if not target_messages:
-                continue  # Skip to the next channel if no valid messages are found
+    if card.tier == "":
+        await actions.send(message.channel, auc_help(message))
+        return
 
-            # Loop through the recent forwarded messages to find an appropriate one for creating a thread
-            for forwarded_msg in target_messages:
-                if forwarded_msg.thread is not None:
-                    continue
-                try:
-                    await create_thread_with_rate_limit(channel, forwarded_msg, "-")
-                    await asyncio.sleep(1)  # Add a 1-second delay between creating threads
-                except Exception as e:
-                    pass
+    await actions.send(message.channel, format_auction(card, preference))
 
+# --- Feature 10: %tier <name> registers the tier of a new placeholder ---
+@router.prefix("tier_admin", "%tier")
+async def handle_tier_admin(message, content):
+    state = guild_state(message)
+    if state is None or message.author.id not in state.config.whitelisted_users:
         return
 
-    # --- Feature 1: %auc reply parser ---
-    if content.lower().startswith('%auc'):
-        if not message.reference or not isinstance(message.reference.resolved, discord.Message):
-            await message.channel.send("read <#1348292826609221642> on how to use `%auc`")
-            return
+    parts = message.content.split(maxsplit=1)  # Keep the tier name's case
+    original = message.reference.resolved if message.reference else None
+    if len(parts) < 2 or not isinstance(original, discord.Message) or not original.embeds:
+        await actions.send(message.channel, "Reply to a Nairi card with `%tier <name>` to register its tier.")
+        return
 
-        original = message.reference.resolved
+    tier = tier_classifier.known_tier(parts[1].strip())
+    if tier is None:
+        await actions.send(message.channel, f"Unknown tier `{parts[1].strip()}`. Use a tier from the channel rules.")
+        return
 
-        if original.author.id != NAIRI_BOT_ID or not original.embeds:
-            await message.channel.send("read <#1348292826609221642> on how to use `%auc`")
-            return
+    try:
+        registered = await tier_classifier.register(original.embeds[0], tier)
+    except ValueError as e:
+        await actions.send(message.channel, str(e))
+        return
+    card_cache.invalidate(original.id)
 
-        embed = original.embeds[0]
-        command_parts = content.split(maxsplit=1)
-        preference = "<:jades:1351944414104129599>"
+    if registered:
+        await actions.send(message.channel, f"Cards with this thumbnail are now **{tier}**.")
+    else:
+        await actions.send(message.channel, "That card has no thumbnail to register.")
 
-        emoji_map = {
-            ":jades:": "<:jades:1351944414104129599>",
-        }
+# --- Feature 2: nv/nview command enforcement in XXX channel ---
+@router.channel("enforcement", guild_directory.enforcement_channel_ids)
+async def handle_enforcement(message, content):
+    if message.author.bot or message.author.id == NAIRI_BOT_ID:
+        return
 
-        if len(command_parts) > 1:
-            raw_pref = command_parts[1]
-            for alias, full in emoji_map.items():
-                raw_pref = raw_pref.replace(alias, full)
-            preference = raw_pref.strip()
+    parts = content.split()
 
-        # Extract card info
-        card_name = embed.title or "Unknown"
-        card_tier = get_card_tier_from_embed(embed)
+    if not parts or parts[0] not in CARD_VIEW_COMMANDS[NAIRI_BOT_ID]:
+        deletes.delete(message)
+        return
 
-        if card_tier == "":
-            await message.channel.send("read <#1348292826609221642> on how to use `%auc`")
-            return
+    # Nairi's reply (and the edit adding its embed) is routed to this waiter by a dict lookup
+    bot_reply = await pending_replies.wait_for_reply(message, REPLY_TIMEOUT)
+    if bot_reply is None:
+        return
 
-        desc = embed.description or ""
-        card_series, card_code, card_print, owned_by = parse_description_for_card_info(desc)
+    # Get card data and check it against the channel's tier and print rules
+    card = await get_classified_card(bot_reply)
+    if card is None:
+        return
+    state = channel_states[message.channel.id]
+    verdict = state.config.rules.check(message.channel.id, card.tier, card.print_number)
+    if verdict.allowed:
+        return
 
-        formatted = (
-            f"Card Code: {card_code}\n"
-            f"{card_print} • {card_name} • {card_series} [ {card_tier} ]\n"
-            f"Owned By: {owned_by}\n"
-            f"Preference: {preference}"
+    # Wrong tier or print → delete messages + warn
+    deletes.delete(message)
+    deletes.delete(bot_reply)
+    state.warnings.add(message.author.id, card.code, format_violation(message, card, verdict))
+
+def format_violation(message, card, verdict):
+    if verdict.reason == "tier":
+        allowed_tiers_str = ", ".join(verdict.rule.tiers)
+        warning = (
+            f"{message.author.mention}, your recently posted card `{card.code}` is **{card.tier}**, "
+            f"but only **{allowed_tiers_str}** cards are allowed in {message.channel.mention}."
+        )
+    else:
+        print_number = card.print_number if card.print_number is not None else card.card_print
+        warning = (
+            f"{message.author.mention}, your recently posted card `{card.code}` has print number **{print_number}**, "
+            f"which is not allowed in {message.channel.mention}."
         )
 
-        await message.channel.send(formatted)
-        return
-        
-    # --- Feature 2: nv/nview command enforcement in XXX channel ---
-    if message.channel.id in PRINT_RANGES:
-        if message.author.bot or message.author.id == NAIRI_BOT_ID:
-            return
-
-        channel_config = PRINT_RANGES[message.channel.id]
-        allowed_range = channel_config["range"]
-        parts = content.lower().strip().split()
+    if verdict.suggested_channel_id:
+        return f"{warning} Please post it in <#{verdict.suggested_channel_id}> instead."
+    if verdict.reason == "print":
+        return f"{warning} Please check the print number and post in the correct channel."
+    return warning
 
-        if not parts or parts[0] not in ("nv", "nview"):
-            try:
-                await message.delete()
-            except discord.Forbidden:
-                pass
-            return
+# --- Feature 8: luvi raid ---
+@router.channel("raid", guild_directory.raid_channel_ids)
+async def handle_raid(message, content):
+    if content not in ("lsr", "lstartraid"):
+        return
 
-        def check_bot_reply(m):
-            return (
-                m.author.id == NAIRI_BOT_ID and
-                m.channel.id == message.channel.id and
-                m.reference and
-                m.reference.message_id == message.id
-            )
+    raids = channel_states[message.channel.id].raids
+    existing = raids.get(message.channel.id)
 
-        try:
-            bot_reply = await client.wait_for("message", timeout=10.0, check=check_bot_reply)
-
-            for _ in range(10):
-                if bot_reply.embeds:
-                    break
-                await asyncio.sleep(0.5)
-                bot_reply = await message.channel.fetch_message(bot_reply.id)
-
-            if not bot_reply.embeds:
-                return
-
-            embed = bot_reply.embeds[0]
-
-            # Get card data
-            desc = embed.description or ""
-            _, card_code, card_print, _ = parse_description_for_card_info(desc)
-            actual_tier = get_card_tier_from_embed(embed)
-
-            allowed_tiers = channel_config["tier"]
-
-            # Normalize to list
-            if isinstance(allowed_tiers, str):
-                allowed_tiers = [allowed_tiers]
-
-            if actual_tier not in allowed_tiers:
-                # Wrong tier → delete messages + warn
-                try:
-                    await message.delete()
-                except discord.Forbidden:
-                    pass
-
-                try:
-                    await bot_reply.delete()
-                except (discord.NotFound, discord.Forbidden):
-                    pass
-
-                allowed_tiers_str = ", ".join(allowed_tiers)
-                warning_channel = client.get_channel(WARNING_CHANNEL_ID)
-                if warning_channel:
-                    await warning_channel.send(
-                        f"{message.author.mention}, your recently posted card `{card_code}` is **{actual_tier}**, "
-                        f"but only **{allowed_tiers_str}** cards are allowed in {message.channel.mention}."
-                    )
-                return  # Don't continue to print check
-
-            # Tier is valid → now do print check
-            # Event printless channels
-            if allowed_range is None:
-                match = re.fullmatch(r"P(\d+)", card_print)
-                if not match:
-                    return
-                
-                print_number = int(match.group(1))
-
-                try:
-                    await message.delete()
-                except discord.Forbidden:
-                    pass
-
-                try:
-                    await bot_reply.delete()
-                except (discord.NotFound, discord.Forbidden):
-                    pass
-
-                warning_channel = client.get_channel(WARNING_CHANNEL_ID)
-                if warning_channel:
-                    await warning_channel.send(
-                        f"{message.author.mention}, your recently posted card `{card_code}` has print number **{print_number}**, "
-                        f"which is not allowed in {message.channel.mention}. Please check the print number and post in the correct channel."
-                    )
-                return
-                
-            # Chroma and normal channels
-            else:
-                allowed_min, allowed_max = allowed_range
-                match = re.fullmatch(r"P(\d+)", card_print)
-                valid = True
-                if not match:
-                    print_number = card_print
-                    valid = False
-                else:
-                    print_number = int(match.group(1))
-                    if print_number < allowed_min or print_number > allowed_max:
-                        valid = False
-                if not valid:
-                    try:
-                        await message.delete()
-                    except discord.Forbidden:
-                        pass
-
-                    try:
-                        await bot_reply.delete()
-                    except (discord.NotFound, discord.Forbidden):
-                        pass
-
-                    warning_channel = client.get_channel(WARNING_CHANNEL_ID)
-                    if warning_channel:
-                        await warning_channel.send(
-                            f"{message.author.mention}, your recently posted card `{card_code}` has print number **{print_number}**, "
-                            f"which is not allowed in {message.channel.mention}. Please check the print number and post in the correct channel."
-                        )
-                    return
-
-        except asyncio.TimeoutError:
-            return
+    if existing and not existing.ended:
 
-    # --- Feature 8: luvi raid ---
-    if content.lower() in ("lsr", "lstartraid"):
+        await actions.reply(
+            message,
+            f"A raid is already running!\n"
+            f"Please use this one:\n{existing.message.jump_url}"
+        )
 
-        if message.channel.id != LUVI_RAID_CHANNEL_ID:
-            return
+        return
 
-        existing = active_raids.get(message.channel.id)
+    session = RaidSession(message.author)
 
-        if existing and not existing.ended:
+    view = RaidView(session)
+    session.view = view
 
-            await message.reply(
-                f"A raid is already running!\n"
-                f"Please use this one:\n{existing.message.jump_url}"
-            )
+    result = await actions.send(
+        message.channel,
+        embed=view.make_embed(),
+        view=view
+    )
+    if not result.ok:
+        return
 
-            return
+    session.message = result.value
+    session.timer = timers.schedule(RAID_TIMER, view.on_timeout)
 
-        session = RaidSession(message.author)
+    raids[message.channel.id] = session
 
-        view = RaidView(session)
-        session.view = view
+router.freeze()
 
-        msg = await message.channel.send(
-            embed=view.make_embed(),
-            view=view
-        )
+@client.event
+async def on_message(message):
+    if message.type == discord.MessageType.thread_created:
+        if is_removable_thread_notice(message):
+            deletes.delete(message)
+        return
 
-        session.message = msg
+    if message.author == client.user:
+        return
 
-        active_raids[message.channel.id] = session
+    if message.author.id == NAIRI_BOT_ID:
+        pending_replies.feed(message)
+    if is_stored_message(message):
+        message_store.add(message)
+        catalog_card_view(message)  # Every nv / nview, wherever it happens
 
-        return
+    await router.dispatch(message, message.content.strip().lower())
 
 
 @client.tree.context_menu(name="Delete Nairi Message")
@@ -744,7 +952,9 @@ async def delete_message(interaction: discord.Interaction, message: discord.Mess
         )
         return
 
-    original_msg = await message.channel.fetch_message(message.reference.message_id)
+    original_msg = message.reference.resolved
+    if not isinstance(original_msg, discord.Message):
+        original_msg = await message.channel.fetch_message(message.reference.message_id)
     if original_msg.author.id != interaction.user.id:
         await interaction.response.send_message(
             "You can only delete your own Nairi messages.", ephemeral=True
@@ -765,45 +975,246 @@ async def delete_message(interaction: discord.Interaction, message: discord.Mess
             "I don't have permission to delete that message.", ephemeral=True
         )
 
+# --- Feature 11: 📝 on an nc message copies its card codes ---
+# Codes from every page the user flips to are gathered into one reply, which is edited
+# as new pages arrive until the session has been idle for MESSAGE_TIMEOUT.
+class CodeCopySession:
+    def __init__(self, user_id, channel):
+        self.user_id = user_id
+        self.channel = channel
+        self.codes = {}         # code: None, an ordered set across pages
+        self.response = None    # Inari's message listing the codes
+        self.lock = asyncio.Lock()
+
+    def add_page(self, embed):
+        before = len(self.codes)
+        for code in parse_collection_codes(embed):
+            self.codes.setdefault(code)
+        return len(self.codes) > before
+
+def codes_file(text):
+    return discord.File(io.BytesIO(text.encode()), filename="card_codes.txt")
+
+async def publish_codes(session):
+    async with session.lock:
+        text = " ".join(session.codes)
+        header = f"**{len(session.codes)}** card codes"
+        attach = len(text) > CODE_COPY_INLINE_MAX
+        content = f"{header} (attached)" if attach else f"{header}\n```\n{text}\n```"
+
+        if session.response is None:
+            result = await actions.send(session.channel, content, **({"file": codes_file(text)} if attach else {}))
+            if result.ok:
+                session.response = result.value
+        else:
+            await actions.edit_message(session.response, content=content,
+                                       **({"attachments": [codes_file(text)]} if attach else {}))
+
+@client.event
+async def on_raw_reaction_add(payload):
+    if str(payload.emoji) != CODE_COPY_EMOJI or payload.user_id == client.user.id:
+        return
+    if payload.message_author_id != NAIRI_BOT_ID:
+        return  # Only Nairi's nc pages, checked before any lookup or fetch
+
+    session = copy_sessions.get_by_message(payload.message_id)
+    if session is not None:
+        copy_sessions.touch(session.user_id)
+        return
+
+    message = message_store.get(payload.channel_id, payload.message_id)
+    if message is None:
+        channel = client.get_channel(payload.channel_id)
+        if channel is None:
+            return
+        try:
+            message = await channel.fetch_message(payload.message_id)
+        except discord.HTTPException:
+            return
+
+    # Only the user who ran nc can copy from it
+    original = message.reference.resolved if message.reference else None
+    if message.author.id != NAIRI_BOT_ID or not message.embeds or not isinstance(original, discord.Message):
+        return
+    parts = original.content.strip().lower().split()
+    if original.author.id != payload.user_id or not parts or parts[0] not in NC_COMMANDS:
+        return
+
+    session = CodeCopySession(payload.user_id, message.channel)
+    if not session.add_page(message.embeds[0]):
+        return  # No codes on this page
+
+    copy_sessions.open(payload.user_id, message.id, session)
+    await publish_codes(session)
+
+# nc pages are flipped by Nairi editing its message
+async def follow_collection_page(payload):
+    session = copy_sessions.get_by_message(payload.message_id)
+    if session is None:
+        return
+
+    copy_sessions.touch(session.user_id)
+    if payload.message.embeds and session.add_page(payload.message.embeds[0]):
+        await publish_codes(session)
+
 # --- Feature 4: auto closing auction channels ---
-async def close_threads(channels_to_close, guild, now_utc):
-    all_threads = await guild.active_threads()
-
-    for thread in all_threads:
-        if thread.parent_id in channels_to_close and not thread.locked:
-            thread_age = now_utc - thread.created_at
-            if thread_age.total_seconds() >= MIN_THREAD_AGE_HOURS * 3600:
-                try:
-                    await thread.edit(archived=True, locked=True)
-                except Exception:
-                    pass
-
-async def auto_close_task_runner(channels, target_hour, target_minute):
-    last_run_date = None
+# Each auction thread is closed by expiry_index at created_at + MIN_THREAD_AGE_HOURS.
+# The daily sweep is only a safety net for threads whose gateway events were missed.
+async def close_thread(thread):
+    return await actions.edit_thread(thread, archived=True, locked=True)
+
+expiry_index = ThreadExpiryIndex(
+    guild_directory.auction_channel_ids,
+    MIN_THREAD_AGE_HOURS * 3600,
+    close_thread,
+    concurrency=THREAD_CLOSE_WORKERS,
+)
+
+async def get_active_threads(guild):
+    # Startup seeding and the sweep share one snapshot per guild instead of each listing it
+    state = guild_states[guild.id]
+    now = time.monotonic()
+    if state.threads_snapshot and now - state.threads_snapshot[0] < ACTIVE_THREADS_SNAPSHOT_TTL:
+        return state.threads_snapshot[1]
+
+    threads = await guild.active_threads()
+    state.threads_snapshot = (now, threads)
+    return threads
+
+async def close_threads(guild):
+    # Re-tracking puts every open auction thread back in the index; overdue ones close right away
+    for thread in await get_active_threads(guild):
+        expiry_index.track(thread)
+
+async def sweep_auction_threads():
     await client.wait_until_ready()
+    for config in guild_directory:
+        guild = client.get_guild(config.guild_id)
+        if guild:
+            await close_threads(guild)
 
-    while not client.is_closed():
-        now_utc = datetime.datetime.now(datetime.timezone.utc)
-        now_sgt = now_utc + datetime.timedelta(hours=8)
-        today_date = now_sgt.date()
+job_scheduler.add("auction_thread_sweep", "0 20 * * *", sweep_auction_threads)  # 8PM SGT safety sweep
 
-        if ((now_sgt.hour > target_hour) or
-            (now_sgt.hour == target_hour and now_sgt.minute >= target_minute)) \
-            and last_run_date != today_date:
+# --- Metrics and health checks, served by the keepalive web server on the bot loop
+loop_monitor = LoopLagMonitor()
+gateway_health = GatewayHealth()
+rate_limit_log = RateLimitLog()  # 429s discord.py waited out, from its discord.http warnings
+logging.getLogger("discord.http").addHandler(rate_limit_log)
 
-            guild = client.get_guild(SERVER_ID)
-            if guild:
-                await close_threads(channels, guild, now_utc)
+@client.event
+async def on_shard_connect(shard_id):
+    gateway_health.mark(shard_id, True)
 
-            last_run_date = today_date
-            await asyncio.sleep(60 * 60 * 20)  # wait ~20 hours
-        else:
-            await asyncio.sleep(60)
+@client.event
+async def on_shard_resumed(shard_id):
+    gateway_health.mark(shard_id, True)
+
+@client.event
+async def on_shard_disconnect(shard_id):
+    gateway_health.mark(shard_id, False)
+
+# Liveness: the event loop is turning and the gateway is up (or still within its reconnect grace)
+def health_status():
+    return gateway_health.check(loop_monitor)
+
+# Readiness: connected, guild cache loaded, able to handle events right now
+def readiness_status():
+    if not client.is_ready():
+        return False, "gateway not ready"
+    if not gateway_health.connected or client.is_closed():
+        return False, "gateway disconnected"
+    return True, "ok"
+
+def render_metrics():
+    metrics = MetricsWriter()
+
+    for name, histogram in router.latency.items():
+        metrics.histogram("handler_seconds", "on_message handler latency by feature", histogram, {"feature": name})
+
+    for (action, status), count in sorted(actions.calls.items(), key=str):
+        metrics.counter("rest_requests_total", "REST calls by action and response status", count,
+                        {"action": action, "status": status})
+    metrics.counter("rest_429_total", "429 responses from Discord, retried or not", rate_limit_log.count)
+    metrics.counter("rest_retry_after_seconds_total", "Seconds of retry-after waited on", rate_limit_log.retry_after_total)
+    metrics.counter("rest_rate_limited_total", "REST actions given up on a retry-after above the limit",
+                    actions.stats["rate_limited"])
+    metrics.counter("rest_failed_total", "REST actions that failed", actions.stats["failed"])
+
+    metrics.counter("deletes_total", "Messages deleted by the delete batcher", deletes.stats["deleted"])
+    metrics.counter("delete_failures_total", "Messages the delete batcher failed to delete", deletes.stats["failed"])
+    metrics.counter("delete_requests_total", "Delete REST calls by kind", deletes.stats["bulk_requests"], {"kind": "bulk"})
+    metrics.counter("delete_requests_total", "Delete REST calls by kind", deletes.stats["single_requests"], {"kind": "single"})
+    metrics.counter("bulk_deleted_messages_total", "Messages removed through bulk delete calls", deletes.stats["bulk_messages"])
+    metrics.gauge("delete_batch_max", "Largest delete batch collected so far", deletes.stats["max_batch"])
+    metrics.histogram("delete_batch_size", "Deletes collected per channel flush", deletes.batch_sizes)
+
+    for shard_id, latency in client.latencies:
+        metrics.gauge("gateway_latency_seconds", "Gateway heartbeat latency per shard", latency, {"shard": shard_id})
+    for shard_id, connected in gateway_health.shard_states():
+        metrics.gauge("gateway_connected", "1 while the shard's gateway connection is up", int(connected),
+                      {"shard": shard_id})
+    metrics.counter("gateway_disconnects_total", "Gateway disconnects", gateway_health.disconnects)
+    metrics.gauge("event_loop_lag_seconds", "Last measured event loop lag", loop_monitor.lag)
+    metrics.histogram("event_loop_lag_probe_seconds", "Event loop lag probes", loop_monitor.histogram)
+
+    queues = {
+        "auto_thread": auto_thread_queue.qsize(),
+        "deletes": len(deletes),
+        "warnings": sum(len(state.warnings) for state in guild_states.values()),
+        "reply_waiters": len(pending_replies),
+        "thread_expiry": len(expiry_index),
+        "thread_notices": len(pending_thread_notices),
+        "catalog_writes": len(card_catalog.pending),
+        "code_copy_sessions": len(copy_sessions),
+    }
+    for queue, depth in queues.items():
+        metrics.gauge("queue_depth", "Items waiting per internal queue", depth, {"queue": queue})
+
+    metrics.gauge("cache_hit_ratio", "Hit ratio per cache", card_cache.hit_rate(), {"cache": "card"})
+    metrics.gauge("cache_entries", "Entries per cache", len(card_cache), {"cache": "card"})
+    metrics.counter("cache_evictions_total", "Evictions per cache", card_cache.stats["evictions"], {"cache": "card"})
+    metrics.gauge("cache_entries", "Entries per cache", len(message_store), {"cache": "message"})
+    metrics.counter("cache_evictions_total", "Evictions per cache", message_store.stats["evicted"], {"cache": "message"})
+    stored = message_store.stats["hits"] + message_store.stats["misses"]
+    metrics.gauge("cache_hit_ratio", "Hit ratio per cache",
+                  message_store.stats["hits"] / stored if stored else 0.0, {"cache": "message"})
+    lookups = card_catalog.stats["lookups"]
+    metrics.gauge("cache_hit_ratio", "Hit ratio per cache",
+                  card_catalog.stats["found"] / lookups if lookups else 0.0, {"cache": "catalog"})
+    for outcome, count in tier_classifier.stats.items():
+        metrics.counter("tier_lookups_total", "Tier classifier lookups by outcome", count, {"outcome": outcome})
+
+    metrics.gauge("live_timers", "Timers pending on the timer wheel", len(timers))
+    for state in guild_states.values():
+        guild = {"guild": state.config.guild_id}
+        metrics.gauge("active_raids", "Raids currently taking signups",
+                      sum(1 for session in state.raids.values() if not session.ended), guild)
+
+        stats = state.warnings.stats
+        metrics.counter("warnings_queued_total", "Enforcement warnings queued for a digest", stats["queued"], guild)
+        metrics.counter("warnings_suppressed_total", "Warnings dropped as repeats of the same user and card",
+                        stats["suppressed"], guild)
+        metrics.counter("warning_digests_total", "Warning digests flushed", stats["flushes"], guild)
+        metrics.counter("warning_digest_messages_total", "Messages sent for warning digests", stats["messages"], guild)
+        metrics.counter("warning_digest_latency_seconds_total", "Time from first queued warning to digest sent",
+                        stats["flush_latency_total"], guild)
+        metrics.gauge("warning_digest_last_merged", "Warnings merged into the last digest", stats["last_merged"], guild)
+        metrics.gauge("warning_digest_last_latency_seconds", "Flush latency of the last digest",
+                      stats["last_flush_latency"], guild)
+    return metrics.render()
+
+web_server = WebServer("0.0.0.0", WEB_PORT, health_status, readiness_status, render_metrics)
 
 @client.event
 async def on_ready():
-    client.loop.create_task(auto_close_task_runner(SOFI_AUTO_CLOSE_THREAD_CHANNEL_IDS, 20, 0))  # 8PM SGT
-    client.loop.create_task(auto_close_task_runner(NAIRI_LUVI_AUTO_CLOSE_THREAD_CHANNEL_IDS, 22, 0))  # 10PM SGT
+    if not expiry_index.seeded:
+        threads = []
+        for config in guild_directory:
+            guild = client.get_guild(config.guild_id)
+            if guild:
+                threads.extend(await get_active_threads(guild))
+        expiry_index.seed(threads)
+
     await client.tree.sync()  # sync globally
 
 # --- Main entry point
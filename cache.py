@@ -0,0 +1,61 @@
+# --- Standard library ---
+import sys
+from collections import OrderedDict
+
+# --- Defaults
+CARD_CACHE_MAX_ENTRIES = 5000
+CARD_CACHE_MAX_BYTES = 4 * 1024 * 1024  # 4 MiB
+ENTRY_OVERHEAD = 120  # bytes, OrderedDict slot + int key + linked list node
+
+
+# Rough footprint of a parsed CardRecord (the tuple plus its strings)
+def record_size(record):
+    return sys.getsizeof(record) + sum(sys.getsizeof(value) for value in record) + ENTRY_OVERHEAD
+
+
+# Bounded LRU of parsed card records keyed by message id. Eviction happens as soon as
+# either the entry count or the estimated memory use goes over its ceiling.
+class CardCache:
+    def __init__(self, max_entries=CARD_CACHE_MAX_ENTRIES, max_bytes=CARD_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # message_id: (record, size)
+        self.bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, message_id):
+        entry = self.entries.get(message_id)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.entries.move_to_end(message_id)
+        self.stats["hits"] += 1
+        return entry[0]
+
+    def put(self, message_id, record):
+        old = self.entries.pop(message_id, None)
+        if old:
+            self.bytes -= old[1]
+
+        size = record_size(record)
+        self.entries[message_id] = (record, size)
+        self.bytes += size
+
+        while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.stats["evictions"] += 1
+
+    def invalidate(self, message_id):
+        entry = self.entries.pop(message_id, None)
+        if entry:
+            self.bytes -= entry[1]
+            self.stats["invalidations"] += 1
+
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
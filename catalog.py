@@ -0,0 +1,143 @@
+# --- Standard library ---
+import asyncio
+import sqlite3
+import time
+
+# --- Local modules ---
+from parsers import CardRecord
+
+FLUSH_INTERVAL = 2.0  # seconds between batched writes
+FLUSH_BATCH = 200     # Pending cards that trigger an early flush
+SCHEMA_VERSION = 2    # PRAGMA user_version of the layout below
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cards (
+    source       TEXT NOT NULL,
+    code         TEXT NOT NULL,
+    name         TEXT NOT NULL,
+    series       TEXT NOT NULL,
+    card_print   TEXT NOT NULL,
+    print_number INTEGER,
+    tier         TEXT NOT NULL,
+    owner_id     INTEGER,
+    message_id   INTEGER,
+    channel_id   INTEGER,
+    updated_at   REAL NOT NULL,
+    PRIMARY KEY (source, code)
+);
+CREATE INDEX IF NOT EXISTS cards_owner ON cards (owner_id);
+CREATE INDEX IF NOT EXISTS cards_tier_print ON cards (tier, print_number);
+"""
+
+UPSERT = """
+INSERT INTO cards (source, code, name, series, card_print, print_number, tier, owner_id, message_id, channel_id, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (source, code) DO UPDATE SET
+    name = excluded.name,
+    series = excluded.series,
+    card_print = excluded.card_print,
+    print_number = excluded.print_number,
+    tier = CASE WHEN excluded.tier != '' THEN excluded.tier ELSE cards.tier END,
+    owner_id = excluded.owner_id,
+    message_id = excluded.message_id,
+    channel_id = excluded.channel_id,
+    updated_at = excluded.updated_at
+"""
+
+SELECT_COLUMNS = "source, name, series, code, card_print, tier, owner_id"
+
+
+# Embedded SQLite catalog of the Nairi and Sofi card views Inari has seen, keyed by
+# (source, code) as every card bot has its own code space, and indexed by owner, tier
+# and print. Writes are queued in memory and flushed in batches from a worker thread;
+# lookups read through the queue first, then a separate read-only connection (WAL
+# mode keeps readers from waiting on the writer).
+class CardCatalog:
+    def __init__(self, path):
+        self.path = path
+        self.pending = {}  # (source, code): row, newest wins
+        self.wakeup = asyncio.Event()
+        self.stats = {"queued": 0, "written": 0, "flushes": 0, "lookups": 0, "found": 0}
+
+        # The catalog refills from card views, so an older layout is dropped, not migrated
+        writer = self.connect()
+        if writer.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            writer.executescript(f"DROP TABLE IF EXISTS cards;\n{SCHEMA}\nPRAGMA user_version = {SCHEMA_VERSION};")
+        writer.close()
+        self.reader = self.connect()
+
+    def connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def add(self, card, message=None):
+        if card is None or card.code == "Unknown":
+            return
+
+        key = (card.source, card.code.upper())
+        tier = card.tier
+        if not tier and key in self.pending:
+            tier = self.pending[key][6]  # Keep a tier already classified for this card
+        self.pending[key] = (
+            key[0], key[1], card.name, card.series, card.card_print, card.print_number,
+            tier, card.owner_id,
+            message.id if message else None,
+            message.channel.id if message else None,
+            time.time(),
+        )
+        self.stats["queued"] += 1
+        if len(self.pending) >= FLUSH_BATCH:
+            self.wakeup.set()
+
+    def get(self, source, code):
+        self.stats["lookups"] += 1
+        code = code.upper()
+
+        row = self.pending.get((source, code))
+        if row:
+            card = CardRecord(row[0], row[2], row[3], row[1], row[4], row[6], row[7])
+        else:
+            found = self.reader.execute(
+                f"SELECT {SELECT_COLUMNS} FROM cards WHERE source = ? AND code = ?", (source, code)
+            ).fetchone()
+            card = CardRecord(*found) if found else None
+
+        if card:
+            self.stats["found"] += 1
+        return card
+
+    def write(self, rows):
+        connection = self.connect()
+        try:
+            with connection:
+                connection.executemany(UPSERT, rows)
+        finally:
+            connection.close()
+
+    async def flush(self):
+        if not self.pending:
+            return
+
+        rows, self.pending = list(self.pending.values()), {}
+        await asyncio.to_thread(self.write, rows)
+        self.stats["written"] += len(rows)
+        self.stats["flushes"] += 1
+
+    # Writes what is still queued; the catalog is not used afterwards
+    async def close(self):
+        await self.flush()
+        self.reader.close()
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            try:
+                await self.flush()
+            except sqlite3.Error:
+                pass  # Keep the bot running; the next parse of these cards queues them again
@@ -0,0 +1,93 @@
+# --- Standard library ---
+import asyncio
+import time
+
+DISCORD_MESSAGE_LIMIT = 2000
+
+
+# Split lines into messages of at most `limit` characters, never breaking a line
+# unless that single line is itself too long
+def chunk_lines(lines, limit=DISCORD_MESSAGE_LIMIT):
+    chunks = []
+    current = ""
+    for line in lines:
+        if len(line) > limit:
+            line = line[:limit - 1] + "…"
+        if current and len(current) + 1 + len(line) > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+# Coalesces enforcement warnings. Warnings that arrive within `window` seconds of the
+# first pending one go out together as a single digest (split only to respect the
+# message length limit), and the same user + card is warned at most once per
+# `dedup_seconds`.
+class WarningDigest:
+    def __init__(self, send, window=2.0, dedup_seconds=600):
+        self.send = send                    # async callable taking the message content
+        self.window = window
+        self.dedup_seconds = dedup_seconds
+        self.pending = []
+        self.first_at = None
+        self.recent = {}                    # (user_id, card_code): time.monotonic() of the last warning
+        self.flush_task = None
+        self.stats = {
+            "queued": 0,
+            "suppressed": 0,
+            "flushes": 0,
+            "messages": 0,
+            "last_merged": 0,
+            "last_flush_latency": 0.0,
+            "flush_latency_total": 0.0,
+        }
+
+    def __len__(self):
+        return len(self.pending)
+
+    def add(self, user_id, card_code, line):
+        now = time.monotonic()
+        key = (user_id, card_code)
+        warned_at = self.recent.get(key)
+        if warned_at is not None and now - warned_at < self.dedup_seconds:
+            self.stats["suppressed"] += 1
+            return False
+
+        self.recent[key] = now
+        self.pending.append(line)
+        self.stats["queued"] += 1
+
+        if self.flush_task is None:
+            self.first_at = now
+            self.flush_task = asyncio.create_task(self.flush_later())
+        return True
+
+    async def flush_later(self):
+        await asyncio.sleep(self.window)
+        await self.flush()
+
+    async def flush(self):
+        lines, self.pending = self.pending, []
+        first_at, self.first_at = self.first_at, None
+        self.flush_task = None
+        if not lines:
+            return
+
+        chunks = chunk_lines(lines)
+        for chunk in chunks:
+            await self.send(chunk)
+
+        latency = time.monotonic() - first_at
+        self.stats["flushes"] += 1
+        self.stats["messages"] += len(chunks)
+        self.stats["last_merged"] = len(lines)
+        self.stats["last_flush_latency"] = latency
+        self.stats["flush_latency_total"] += latency
+
+        # Forget users whose suppression period is over
+        cutoff = time.monotonic() - self.dedup_seconds
+        self.recent = {key: warned_at for key, warned_at in self.recent.items() if warned_at > cutoff}
@@ -0,0 +1,87 @@
+# --- Standard library ---
+import asyncio
+import heapq
+import time
+
+# --- Third-party packages ---
+import discord
+
+
+# Min-heap of auction thread deadlines (created_at + max age). One task sleeps until the
+# earliest deadline and hands each expired thread to `close_thread`, at most
+# `concurrency` at a time. Entries are replaced lazily: re-tracking or discarding a
+# thread only updates `deadlines`, and stale heap entries are skipped when popped.
+class ThreadExpiryIndex:
+    def __init__(self, channel_ids, max_age_seconds, close_thread, concurrency=4):
+        self.channel_ids = frozenset(channel_ids)
+        self.max_age_seconds = max_age_seconds
+        self.close_thread = close_thread
+        self.slots = asyncio.Semaphore(concurrency)
+        self.heap = []          # (deadline, thread_id)
+        self.deadlines = {}     # thread_id: current deadline
+        self.threads = {}       # thread_id: discord.Thread
+        self.closing = set()    # Close tasks in flight
+        self.wakeup = asyncio.Event()
+        self.seeded = False
+        self.stats = {"closed": 0, "failed": 0}
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def deadline_of(self, thread):
+        created_at = thread.created_at or discord.utils.snowflake_time(thread.id)
+        return created_at.timestamp() + self.max_age_seconds
+
+    def track(self, thread):
+        if thread.parent_id not in self.channel_ids:
+            return
+        if thread.locked or thread.archived:
+            self.discard(thread.id)
+            return
+
+        deadline = self.deadline_of(thread)
+        self.threads[thread.id] = thread
+        if self.deadlines.get(thread.id) == deadline:
+            return
+
+        self.deadlines[thread.id] = deadline
+        heapq.heappush(self.heap, (deadline, thread.id))
+        if self.heap[0][1] == thread.id:
+            self.wakeup.set()  # New earliest deadline, re-arm the timer
+
+    def discard(self, thread_id):
+        self.deadlines.pop(thread_id, None)
+        self.threads.pop(thread_id, None)
+
+    def seed(self, threads):
+        for thread in threads:
+            self.track(thread)
+        self.seeded = True
+
+    async def run(self):
+        while True:
+            now = time.time()
+            while self.heap and self.heap[0][0] <= now:
+                deadline, thread_id = heapq.heappop(self.heap)
+                if self.deadlines.get(thread_id) != deadline:
+                    continue  # Stale entry, the thread was re-tracked or discarded
+
+                del self.deadlines[thread_id]
+                task = asyncio.create_task(self.close(self.threads.pop(thread_id)))
+                self.closing.add(task)
+                task.add_done_callback(self.closing.discard)
+
+            timeout = self.heap[0][0] - now if self.heap else None
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def close(self, thread):
+        async with self.slots:
+            try:
+                result = await self.close_thread(thread)
+            except Exception:
+                result = None
+        self.stats["closed" if result else "failed"] += 1
@@ -0,0 +1,92 @@
+# --- Standard library ---
+import json
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+
+# --- Local modules ---
+from rules import RuleIndex
+
+
+# Everything Inari needs to know about one trading server, compiled once at startup
+class GuildConfig(NamedTuple):
+    guild_id: int
+    warning_channel_id: Optional[int]   # market-warn channel for enforcement digests
+    auc_help_channel_id: Optional[int]  # Channel linked when %auc is used wrongly
+    whitelisted_users: frozenset        # May run %nthread / %sthread / %lthread / %tier
+    nairi_auction_channel_ids: frozenset
+    sofi_auction_channel_ids: frozenset
+    luvi_auction_channel_ids: frozenset
+    raid_channel_ids: frozenset
+    rules: RuleIndex                    # Enforcement channels compiled from print_ranges
+
+    @property
+    def auction_channel_ids(self):
+        return self.nairi_auction_channel_ids | self.sofi_auction_channel_ids | self.luvi_auction_channel_ids
+
+def compile_guild(guild_id, warning_channel_id=None, auc_help_channel_id=None, whitelisted_users=(),
+                  nairi_auction_channel_ids=(), sofi_auction_channel_ids=(), luvi_auction_channel_ids=(),
+                  raid_channel_ids=(), print_ranges=None):
+    return GuildConfig(
+        guild_id=int(guild_id),
+        warning_channel_id=int(warning_channel_id) if warning_channel_id else None,
+        auc_help_channel_id=int(auc_help_channel_id) if auc_help_channel_id else None,
+        whitelisted_users=frozenset(map(int, whitelisted_users)),
+        nairi_auction_channel_ids=frozenset(map(int, nairi_auction_channel_ids)),
+        sofi_auction_channel_ids=frozenset(map(int, sofi_auction_channel_ids)),
+        luvi_auction_channel_ids=frozenset(map(int, luvi_auction_channel_ids)),
+        raid_channel_ids=frozenset(map(int, raid_channel_ids)),
+        rules=RuleIndex({int(channel_id): config for channel_id, config in (print_ranges or {}).items()}),
+    )
+
+# Extra servers from a JSON list of compile_guild() keyword objects; print_ranges keys are channel ids
+def load_guild_configs(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        return []
+    return [compile_guild(**entry) for entry in entries]
+
+
+# Frozen lookup tables over every configured guild. Channel ids are unique across
+# Discord, so one channel → guild table answers "whose rules apply here" with a single
+# dict lookup however many guilds are configured.
+class GuildDirectory:
+    def __init__(self, configs):
+        by_guild = {}
+        by_channel = {}
+
+        for config in configs:
+            if config.guild_id in by_guild:
+                raise ValueError(f"Guild {config.guild_id} is configured twice")
+            by_guild[config.guild_id] = config
+
+            channel_ids = config.auction_channel_ids | config.raid_channel_ids | config.rules.channel_ids
+            for channel_id in channel_ids:
+                owner = by_channel.get(channel_id)
+                if owner is not None and owner.guild_id != config.guild_id:
+                    raise ValueError(f"Channel {channel_id} is configured for guilds {owner.guild_id} and {config.guild_id}")
+                by_channel[channel_id] = config
+
+        self.by_guild = MappingProxyType(by_guild)
+        self.by_channel = MappingProxyType(by_channel)
+        self.nairi_auction_channel_ids = frozenset().union(*(c.nairi_auction_channel_ids for c in configs))
+        self.sofi_auction_channel_ids = frozenset().union(*(c.sofi_auction_channel_ids for c in configs))
+        self.luvi_auction_channel_ids = frozenset().union(*(c.luvi_auction_channel_ids for c in configs))
+        self.auction_channel_ids = (
+            self.nairi_auction_channel_ids | self.sofi_auction_channel_ids | self.luvi_auction_channel_ids
+        )
+        self.raid_channel_ids = frozenset().union(*(c.raid_channel_ids for c in configs))
+        self.enforcement_channel_ids = frozenset().union(*(c.rules.channel_ids for c in configs))
+
+    def __iter__(self):
+        return iter(self.by_guild.values())
+
+    def __len__(self):
+        return len(self.by_guild)
+
+    def for_guild(self, guild_id):
+        return self.by_guild.get(guild_id)
+
+    def for_channel(self, channel_id):
+        return self.by_channel.get(channel_id)
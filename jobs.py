@@ -0,0 +1,182 @@
+# --- Standard library ---
+import asyncio
+import datetime
+import json
+import os
+
+SGT = datetime.timezone(datetime.timedelta(hours=8), "SGT")
+MAX_LOOKAHEAD_DAYS = 366 * 4  # Long enough for "0 0 29 2 *" (leap day) schedules
+
+
+# Minimal cron expression: "minute hour day-of-month month day-of-week".
+# Fields accept *, numbers, lists (1,2), ranges (1-5) and steps (*/15, 0-30/10).
+# Day-of-week runs 0-6 from Sunday, like cron.
+class CronSchedule:
+    FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+    def __init__(self, expression, tz=SGT):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+
+        self.expression = expression
+        self.tz = tz
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self.parse_field(field, low, high)
+            for field, (low, high) in zip(fields, self.FIELD_RANGES)
+        )
+
+    @staticmethod
+    def parse_field(field, low, high):
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = end = int(part)
+
+            if start < low or end > high or step < 1:
+                raise ValueError(f"Cron field {field!r} is outside {low}-{high}")
+            values.update(range(start, end + 1, step))
+        return tuple(sorted(values))
+
+    def day_matches(self, day):
+        return (
+            day.day in self.days
+            and day.month in self.months
+            and (day.isoweekday() % 7) in self.weekdays
+        )
+
+    # First window strictly after `after`
+    def next_after(self, after):
+        after = after.astimezone(self.tz)
+        day = after.date()
+        for _ in range(MAX_LOOKAHEAD_DAYS):
+            if self.day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        window = datetime.datetime(day.year, day.month, day.day, hour, minute, tzinfo=self.tz)
+                        if window > after:
+                            return window
+            day += datetime.timedelta(days=1)
+        raise ValueError(f"Cron expression {self.expression!r} never fires")
+
+    # Latest window at or before `at`
+    def previous_at(self, at):
+        at = at.astimezone(self.tz)
+        day = at.date()
+        for _ in range(MAX_LOOKAHEAD_DAYS):
+            if self.day_matches(day):
+                for hour in reversed(self.hours):
+                    for minute in reversed(self.minutes):
+                        window = datetime.datetime(day.year, day.month, day.day, hour, minute, tzinfo=self.tz)
+                        if window <= at:
+                            return window
+            day -= datetime.timedelta(days=1)
+        return None
+
+
+class Job:
+    def __init__(self, name, schedule, func):
+        self.name = name
+        self.schedule = schedule
+        self.func = func    # async callable, no arguments
+        self.task = None
+
+
+# Durable scheduler with one timer task per job. The journal (a small JSON file)
+# records the last window each job ran for, written atomically before and after the
+# run, so a restart neither repeats a finished window nor skips a missed one:
+# missed windows are caught up once on startup.
+class JobScheduler:
+    def __init__(self, journal_path):
+        self.journal_path = journal_path
+        self.jobs = {}
+        self.journal = self.load_journal()
+        self.started = False
+
+    def load_journal(self):
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_journal(self):
+        tmp_path = f"{self.journal_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.journal, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.journal_path)
+
+    def add(self, name, cron, func, tz=SGT):
+        self.jobs[name] = Job(name, CronSchedule(cron, tz), func)
+
+    def last_window(self, job):
+        entry = self.journal.get(job.name)
+        if not entry:
+            return None
+        window = datetime.datetime.fromisoformat(entry["window"])
+        # A window that was claimed but never finished (crash mid-run) still has to run
+        if entry.get("status") != "done":
+            return window - datetime.timedelta(microseconds=1)
+        return window
+
+    def record(self, job, window, status):
+        self.journal[job.name] = {
+            "window": window.isoformat(),
+            "status": status,
+            "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
+        self.save_journal()
+
+    # Safe to call from every on_ready / setup_hook: timers are only created once
+    def start(self):
+        if self.started:
+            return
+        self.started = True
+        for job in self.jobs.values():
+            job.task = asyncio.create_task(self.run_timer(job))
+
+    def stop(self):
+        for job in self.jobs.values():
+            if job.task:
+                job.task.cancel()
+        self.started = False
+
+    async def run_timer(self, job):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        last = self.last_window(job)
+        due = job.schedule.previous_at(now)
+
+        if last is None:
+            # First run of a new job: start from the next window, nothing to catch up
+            if due:
+                self.record(job, due, "done")
+                last = due
+        elif due and due > last:
+            await self.run_window(job, due)  # Catch up missed windows once
+            last = due
+
+        while True:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            # Never before the last window, in case the sleep below woke up a little early
+            window = job.schedule.next_after(max(now, last) if last else now)
+            await asyncio.sleep(max(0, (window - now).total_seconds()))
+            await self.run_window(job, window)
+            last = window
+
+    async def run_window(self, job, window):
+        self.record(job, window, "running")
+        try:
+            await job.func()
+        except Exception:
+            pass  # Not retried within the window, the next one picks the work up again
+        self.record(job, window, "done")
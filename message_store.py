@@ -0,0 +1,68 @@
+# --- Standard library ---
+from collections import OrderedDict
+
+MANAGED_CAPACITY = 50       # Messages kept per auction / enforcement / raid channel
+OTHER_CAPACITY = 10         # Messages kept per other channel
+OTHER_CHANNELS_MAX = 200    # Other channels tracked at once, least recently used dropped first
+
+
+# Replacement for discord.py's global message deque (max_messages=None). Only the
+# messages Inari reads again are added, into per-channel ring buffers: managed
+# channels get a bigger one, and other channels share an LRU of small ones. Lookups,
+# inserts and evictions are O(1).
+class MessageStore:
+    def __init__(self, managed_channel_ids, managed_capacity=MANAGED_CAPACITY,
+                 other_capacity=OTHER_CAPACITY, other_channels_max=OTHER_CHANNELS_MAX):
+        self.managed_channel_ids = frozenset(managed_channel_ids)
+        self.managed_capacity = managed_capacity
+        self.other_capacity = other_capacity
+        self.other_channels_max = other_channels_max
+        self.managed = {}               # channel_id: OrderedDict(message_id: message)
+        self.other = OrderedDict()      # channel_id: OrderedDict(message_id: message), LRU order
+        self.stats = {"added": 0, "evicted": 0, "hits": 0, "misses": 0}
+
+    def __len__(self):
+        return sum(len(buffer) for buffer in self.managed.values()) + sum(len(buffer) for buffer in self.other.values())
+
+    def buffer(self, channel_id, create=False):
+        if channel_id in self.managed_channel_ids:
+            buffer = self.managed.get(channel_id)
+            if buffer is None and create:
+                buffer = self.managed[channel_id] = OrderedDict()
+            return buffer, self.managed_capacity
+
+        buffer = self.other.get(channel_id)
+        if buffer is not None:
+            self.other.move_to_end(channel_id)
+        elif create:
+            buffer = self.other[channel_id] = OrderedDict()
+            while len(self.other) > self.other_channels_max:
+                _, dropped = self.other.popitem(last=False)
+                self.stats["evicted"] += len(dropped)
+        return buffer, self.other_capacity
+
+    def add(self, message):
+        buffer, capacity = self.buffer(message.channel.id, create=True)
+        buffer[message.id] = message
+        buffer.move_to_end(message.id)
+        self.stats["added"] += 1
+        while len(buffer) > capacity:
+            buffer.popitem(last=False)
+            self.stats["evicted"] += 1
+
+    def get(self, channel_id, message_id):
+        buffer, _ = self.buffer(channel_id)
+        message = buffer.get(message_id) if buffer else None
+        self.stats["hits" if message is not None else "misses"] += 1
+        return message
+
+    # Edits replace the stored copy, but never add a message that was not stored
+    def update(self, message):
+        buffer, _ = self.buffer(message.channel.id)
+        if buffer and message.id in buffer:
+            buffer[message.id] = message
+
+    def discard(self, channel_id, message_id):
+        buffer, _ = self.buffer(channel_id)
+        if buffer:
+            buffer.pop(message_id, None)
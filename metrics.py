@@ -0,0 +1,169 @@
+# --- Standard library ---
+import asyncio
+import logging
+import math
+import time
+from bisect import bisect_left
+
+# Upper bounds in seconds. Enforcement handlers wait up to REPLY_TIMEOUT for Nairi.
+HANDLER_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+BATCH_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500)  # Items per batch
+LAG_INTERVAL = 0.5       # seconds between event loop lag probes
+HEARTBEAT_MAX_AGE = 10   # seconds without a lag probe before the loop counts as stuck
+DISCONNECT_GRACE = 120   # seconds a gateway reconnect may take before the bot is unhealthy
+
+
+# Prometheus-style histogram; bucket counts are kept per bucket and cumulated on render
+class Histogram:
+    def __init__(self, buckets=HANDLER_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+
+# --- Text exposition format
+def format_value(value):
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value) if not value.is_integer() else str(int(value))
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n"))
+        for key, value in labels.items()
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+# Collects samples for one scrape; samples of the same metric share a HELP / TYPE header
+class MetricsWriter:
+    def __init__(self, prefix="inari_"):
+        self.prefix = prefix
+        self.families = {}  # name: (type, help, [lines])
+
+    def family(self, kind, name, help_text):
+        name = self.prefix + name
+        if name not in self.families:
+            self.families[name] = (kind, help_text, [])
+        return name, self.families[name][2]
+
+    def counter(self, name, help_text, value, labels=None):
+        name, lines = self.family("counter", name, help_text)
+        lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+
+    def gauge(self, name, help_text, value, labels=None):
+        name, lines = self.family("gauge", name, help_text)
+        lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+
+    def histogram(self, name, help_text, histogram, labels=None):
+        name, lines = self.family("histogram", name, help_text)
+        labels = labels or {}
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{format_labels({**labels, 'le': format_value(bound)})} {cumulative}")
+        lines.append(f"{name}_bucket{format_labels({**labels, 'le': '+Inf'})} {histogram.count}")
+        lines.append(f"{name}_sum{format_labels(labels)} {format_value(histogram.sum)}")
+        lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+
+    def render(self):
+        out = []
+        for name, (kind, help_text, lines) in self.families.items():
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(lines)
+        return "\n".join(out) + "\n"
+
+
+# Sleeps `interval` in a loop and records how late it wakes up. The last wake-up
+# doubles as a heartbeat: a blocked event loop stops updating it.
+class LoopLagMonitor:
+    def __init__(self, interval=LAG_INTERVAL):
+        self.interval = interval
+        self.lag = 0.0
+        self.heartbeat = time.monotonic()
+        self.histogram = Histogram(LAG_BUCKETS)
+
+    @property
+    def alive(self):
+        return time.monotonic() - self.heartbeat < HEARTBEAT_MAX_AGE
+
+    async def run(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.heartbeat = time.monotonic()
+            self.lag = max(0.0, self.heartbeat - started - self.interval)
+            self.histogram.observe(self.lag)
+
+
+# discord.py waits out 429s itself and only logs them: a WARNING on the discord.http
+# logger per 429, with retry_after as the last argument. Attached to that logger, this
+# handler counts them and adds up the time waited.
+class RateLimitLog(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.count = 0
+        self.retry_after_total = 0.0
+
+    def emit(self, record):
+        if "responded with 429" not in str(record.msg):
+            return
+        self.count += 1
+        if "erroring instead" not in str(record.msg) and record.args:
+            self.retry_after_total += float(record.args[-1])  # Waited before the retry
+
+
+# --- Health
+# Gateway connection state per shard, from on_shard_connect / _resumed / _disconnect.
+# discord.py reconnects by itself, so a shard that is down only makes the bot unhealthy
+# once it has been down for longer than `grace` seconds.
+class GatewayHealth:
+    def __init__(self, grace=DISCONNECT_GRACE):
+        self.grace = grace
+        self.shards = {}                    # shard_id: (connected, time.monotonic() of the last change)
+        self.started_at = time.monotonic()
+        self.disconnects = 0
+
+    @property
+    def connected(self):
+        return bool(self.shards) and all(connected for connected, _ in self.shards.values())
+
+    def shard_states(self):
+        return sorted((shard_id, connected) for shard_id, (connected, _) in self.shards.items())
+
+    def mark(self, shard_id, connected):
+        current = self.shards.get(shard_id)
+        if current is None or current[0] != connected:
+            self.shards[shard_id] = (connected, time.monotonic())
+            if not connected:
+                self.disconnects += 1
+
+    def check(self, loop_monitor):
+        if not loop_monitor.alive:
+            return False, "event loop stalled"
+        if self.connected:
+            return True, "ok"
+
+        down = [(since, shard_id) for shard_id, (connected, since) in self.shards.items() if not connected]
+        since, shard_id = min(down) if down else (self.started_at, None)  # No shard up yet: still logging in
+        down_for = time.monotonic() - since
+        if down_for < self.grace:
+            return True, f"reconnecting for {down_for:.0f}s"
+        if shard_id is None:
+            return False, f"gateway not connected after {down_for:.0f}s"
+        return False, f"shard {shard_id} disconnected for {down_for:.0f}s"
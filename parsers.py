@@ -0,0 +1,231 @@
+# --- Standard library ---
+import re
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+
+# --- Precompiled patterns
+MENTION_RE = re.compile(r"<@!?(\d+)>")
+NAIRI_CODE_PRINT_RE = re.compile(r"`([A-Z0-9]+)`\s*·\s*`([^`]+)`")
+NAIRI_PRINT_RE = re.compile(r"P-(\d+)", re.IGNORECASE)
+PRINT_NUMBER_RE = re.compile(r"P(\d+)")
+# First backticked code on a line of an nc collection page
+NAIRI_COLLECTION_CODE_RE = re.compile(r"^[^`\n]*`([A-Z0-9]+)`", re.MULTILINE)
+# "**Label:** value", "Label · value", "Label - value" lines used by Sofi and Luvi embeds
+LABEL_RE = re.compile(r"^[*_>\s]*([A-Za-z ]+?)[*_\s]*[:·\-]\s*[*_`]*(.+?)[*_`]*\s*$")
+PRINT_DIGITS_RE = re.compile(r"#?\s*(\d+)")
+
+# Discord thumbnail placeholder of the tier icon → card tier
+TIER_PLACEHOLDER_MAP = MappingProxyType({
+    "8ReCBQIkKejmCJuYe19FrwU6B3iHeIl3Zw==": "T1",
+    "8veBBQAkJ7rYGK2XDXeYb5b5B2iHeIl3WA==": "T2",
+    "cgiCBQAkSsTJFnWM+Gdm0ICjB3iIZ4Z5lw==": "Smr25",
+    "rTiCDQIkaobZB461lndnYHcGB3iIZ4Z5lw==": "Smr26",
+    "KymCDQAkGfm6N4Scl2dnYF9FB2iHZ4Z5lw==": "Xmas25",
+    "b1iCBQIkOceaVpCNynZ2YGcHB3iIZ4Z5pw==": "Val26",
+    "7GiCDQQkiFe5No9jeHdmcGQHB3iHaIaJlw==": "Skr26",
+})
+
+# Label (lower case) → CardRecord field, for the labelled Sofi / Luvi layouts
+LABEL_FIELDS = MappingProxyType({
+    "card": "name",
+    "name": "name",
+    "character": "name",
+    "series": "series",
+    "anime": "series",
+    "code": "code",
+    "id": "code",
+    "print": "card_print",
+    "issue": "card_print",
+    "tier": "tier",
+    "rarity": "tier",
+    "owner": "owner",
+    "owned by": "owner",
+})
+
+
+# One parsed card, whatever bot it came from
+class CardRecord(NamedTuple):
+    source: str                 # "nairi", "sofi" or "luvi"
+    name: str
+    series: str
+    code: str
+    card_print: str             # "P123" when the print is numbered
+    tier: str                   # "" when unknown
+    owner_id: Optional[int]
+
+    @property
+    def owner_mention(self):
+        return f"<@{self.owner_id}>" if self.owner_id else "Unknown"
+
+    @property
+    def print_number(self):
+        match = PRINT_NUMBER_RE.fullmatch(self.card_print)
+        return int(match.group(1)) if match else None
+
+
+# --- Shared helpers
+def find_owner_id(embed):
+    # 1. Check the description first (if it's not None)
+    if embed.description:
+        match = MENTION_RE.search(embed.description)
+        if match:
+            return int(match.group(1))
+
+    # 2. Fall back to the embed fields, the last mention wins
+    for field in reversed(embed.fields):
+        match = MENTION_RE.search(field.value)
+        if match:
+            return int(match.group(1))
+
+    return None
+
+def get_placeholder(embed):
+    if embed.thumbnail and hasattr(embed.thumbnail, "placeholder"):
+        return embed.thumbnail.placeholder or ""
+    return ""
+
+
+# --- Parsers
+class NairiParser:
+    source = "nairi"
+
+    def parse_embed(self, embed):
+        series, card_code, card_print, owner_mention = parse_description_for_card_info(embed.description or "")
+
+        owner_id = int(owner_mention[2:-1]) if owner_mention != "Unknown" else find_owner_id(embed)
+
+        return CardRecord(
+            source=self.source,
+            name=embed.title or "Unknown",
+            series=series,
+            code=card_code,
+            card_print=card_print,
+            tier=get_card_tier_from_embed(embed),
+            owner_id=owner_id,
+        )
+
+
+# Sofi and Luvi cards list their details as "Label: value" lines in the description or fields
+class LabelledParser:
+    def __init__(self, source):
+        self.source = source
+
+    def parse_embed(self, embed):
+        values = {}
+
+        for line in (embed.description or "").splitlines():
+            self.read_label(line, values)
+        for field in embed.fields:
+            self.read_label(f"{field.name}: {field.value}", values)
+
+        return self.build(embed.title, values, find_owner_id(embed), get_card_tier_from_embed(embed))
+
+    def parse_text(self, text):
+        values = {}
+        owner_id = None
+
+        for line in text.splitlines():
+            self.read_label(line, values)
+            if owner_id is None:
+                match = MENTION_RE.search(line)
+                if match:
+                    owner_id = int(match.group(1))
+
+        return self.build(None, values, owner_id, "")
+
+    def read_label(self, line, values):
+        match = LABEL_RE.match(line)
+        if not match:
+            return
+
+        key = LABEL_FIELDS.get(match.group(1).strip().lower())
+        if key and key not in values:
+            values[key] = match.group(2).strip()
+
+    def build(self, title, values, owner_id, tier):
+        card_print = values.get("card_print", "Unknown")
+        match = PRINT_DIGITS_RE.fullmatch(card_print)
+        if match:
+            card_print = f"P{match.group(1)}"
+
+        if owner_id is None:
+            match = MENTION_RE.search(values.get("owner", ""))
+            owner_id = int(match.group(1)) if match else None
+
+        return CardRecord(
+            source=self.source,
+            name=title or values.get("name", "Unknown"),
+            series=values.get("series", "Unknown"),
+            code=values["code"].strip("`").upper() if "code" in values else "Unknown",
+            card_print=card_print,
+            tier=tier or values.get("tier", ""),
+            owner_id=owner_id,
+        )
+
+
+# Source bot id → parser. Forwarded messages (message_snapshots) carry no author,
+# so they go to the forwarded parser (Luvi auctions are forwarded posts).
+class ParserRegistry:
+    def __init__(self, parsers, forwarded=None):
+        self.parsers = MappingProxyType(dict(parsers))
+        self.forwarded = forwarded
+
+    def parse_message(self, message):
+        parser = self.parsers.get(message.author.id)
+        if parser and message.embeds:
+            return parser.parse_embed(message.embeds[0])
+
+        snapshots = getattr(message, "message_snapshots", None)
+        if self.forwarded and snapshots:
+            snapshot = snapshots[0]
+            if snapshot.embeds:
+                return self.forwarded.parse_embed(snapshot.embeds[0])
+            if snapshot.content:
+                return self.forwarded.parse_text(snapshot.content)
+
+        return None
+
+
+# --- Nairi helpers, also used directly by the enforcement and %auc paths
+# Extract card info
+def parse_description_for_card_info(description):
+    lines = description.splitlines()
+
+    # --- SERIES (line 0)
+    series = lines[0].strip("* ") if len(lines) > 0 else "Unknown"
+
+    # --- CARD + PRINT (line 1)
+    card_code = "Unknown"
+    card_print = "Unknown"
+
+    if len(lines) > 1:
+        card_match = NAIRI_CODE_PRINT_RE.search(lines[1])
+        if card_match:
+            card_code = card_match.group(1)
+            raw_print = card_match.group(2)
+
+            # Normalize only if it's P-XXX
+            match = NAIRI_PRINT_RE.fullmatch(raw_print)
+            if match:
+                card_print = f"P{match.group(1)}"
+            else:
+                card_print = raw_print
+
+    # --- OWNER (line 2)
+    owner_mention = "Unknown"
+
+    if len(lines) > 2:
+        owner_match = MENTION_RE.search(lines[2])
+        if owner_match:
+            owner_mention = f"<@{owner_match.group(1)}>"
+
+    return series, card_code, card_print, owner_mention
+
+# Card codes listed on an nc collection page, in page order
+def parse_collection_codes(embed):
+    text = "\n".join([embed.description or ""] + [field.value for field in embed.fields])
+    return NAIRI_COLLECTION_CODE_RE.findall(text)
+
+# Extract card tier
+def get_card_tier_from_embed(embed):
+    return TIER_PLACEHOLDER_MAP.get(get_placeholder(embed), "")  # Default to "" if unknown
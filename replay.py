@@ -0,0 +1,651 @@
+# Replay harness: feeds recorded or synthetic gateway events through bot.py's handlers
+# with a fake client and REST layer, and reports throughput, per-feature handler
+# latency and the REST calls the handlers issued.
+#
+#   python replay.py synth events.jsonl.gz --scenarios 5000
+#   python replay.py run events.jsonl.gz [--speed 1] [--rest-latency 0.05] [--auto-thread] [--json]
+#   python replay.py record events.jsonl.gz      (runs the real bot, TOKEN from .env)
+#
+# Events are gzip JSONL, one object per line with "t" (seconds since the first event)
+# and "type": message, message_edit, thread_create or raid_click.
+
+# --- Standard library ---
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from collections import Counter, deque
+from types import SimpleNamespace
+
+# --- Third-party packages ---
+import discord
+
+# --- Local modules ---
+from parsers import TIER_PLACEHOLDER_MAP
+
+CHANNEL_HISTORY = 100  # Messages a fake channel keeps for history()
+RAID_WAIT = 1.0        # seconds a raid click waits for its raid to be posted
+GENERAL_CHANNEL_ID = 1  # Synthetic channel with no handlers
+
+
+# --- Event files
+def read_events(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def write_events(path, events):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+# --- Fake REST layer
+# Every Discord call the handlers make ends up here: counted by route, optionally delayed
+class FakeRest:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+
+    async def call(self, route, value=None):
+        self.calls[route] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return value
+
+
+class FakeUser:
+    def __init__(self, user_id, bot=False):
+        self.id = user_id
+        self.bot = bot
+        self.name = f"user{user_id % 100000}"
+        self.display_name = self.name
+        self.mention = f"<@{user_id}>"
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class FakeMessage:
+    def __init__(self, harness, channel, event):
+        self.harness = harness
+        self.id = event["id"]
+        self.channel = channel
+        self.author = harness.user(event["author_id"], event.get("author_bot", False))
+        self.content = event.get("content", "")
+        self.embeds = [discord.Embed.from_dict(data) for data in event.get("embeds", [])]
+        self.type = discord.MessageType[event.get("message_type", "default")]
+        self.created_at = discord.utils.utcnow()
+        self.thread = None
+        self.jump_url = f"https://discord.com/channels/0/{channel.id}/{self.id}"
+        self.guild = harness.guild_of(channel.id)
+        self.message_snapshots = [
+            SimpleNamespace(
+                content=snapshot.get("content", ""),
+                embeds=[discord.Embed.from_dict(data) for data in snapshot.get("embeds", [])],
+            )
+            for snapshot in event.get("snapshots", [])
+        ]
+
+        reference_id = event.get("reference_id")
+        if reference_id:
+            self.reference = SimpleNamespace(
+                message_id=reference_id,
+                channel_id=event.get("reference_channel_id", channel.id),
+                resolved=harness.messages.get(reference_id),
+            )
+        else:
+            self.reference = None
+
+    async def delete(self):
+        await self.harness.rest.call("delete_message")
+
+    async def edit(self, **fields):
+        if "embed" in fields:
+            self.embeds = [fields["embed"]]
+        return await self.harness.rest.call("edit_message", self)
+
+    async def reply(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+
+class FakeChannel:
+    def __init__(self, harness, channel_id):
+        self.harness = harness
+        self.id = channel_id
+        self.mention = f"<#{channel_id}>"
+        self.history_messages = deque(maxlen=CHANNEL_HISTORY)
+
+    async def send(self, content=None, **kwargs):
+        message = self.harness.bot_message(self, content or "", kwargs.get("embed"))
+        return await self.harness.rest.call("send_message", message)
+
+    async def delete_messages(self, messages):
+        await self.harness.rest.call("bulk_delete")
+
+    async def create_thread(self, name, message=None, type=None):
+        thread = FakeThread(self.harness, message.id, self.id, name)
+        await self.harness.rest.call("create_thread")
+        message.thread = thread
+        self.harness.echo_thread(self, thread)
+        return thread
+
+    async def history(self, limit=100):
+        for message in list(reversed(self.history_messages))[:limit]:
+            yield message
+
+
+class FakeThread(FakeChannel):
+    def __init__(self, harness, thread_id, parent_id, name):
+        super().__init__(harness, thread_id)
+        self.parent_id = parent_id
+        self.name = name
+        self.created_at = discord.utils.utcnow()
+        self.archived = False
+        self.locked = False
+
+    async def edit(self, **fields):
+        self.archived = fields.get("archived", self.archived)
+        self.locked = fields.get("locked", self.locked)
+        return await self.harness.rest.call("edit_thread", self)
+
+
+class FakeInteractionResponse:
+    def __init__(self, rest):
+        self.rest = rest
+
+    async def defer(self, **kwargs):
+        await self.rest.call("interaction_defer")
+
+    async def edit_message(self, **kwargs):
+        await self.rest.call("interaction_edit")
+
+    async def send_message(self, *args, **kwargs):
+        await self.rest.call("interaction_send")
+
+
+# --- Replay
+class Harness:
+    def __init__(self, bot, rest):
+        self.bot = bot
+        self.rest = rest
+        self.users = {}
+        self.channels = {}
+        self.messages = {}          # message id: FakeMessage, for replies and edits
+        self.latencies = {}         # feature: [seconds]
+        self.tasks = set()
+        self.next_id = discord.utils.time_snowflake(discord.utils.utcnow())
+        self.bot_user = self.user(self.new_id(), bot=True)
+
+    def new_id(self):
+        self.next_id += 1
+        return self.next_id
+
+    def user(self, user_id, bot=False):
+        user = self.users.get(user_id)
+        if user is None:
+            user = self.users[user_id] = FakeUser(user_id, bot)
+        return user
+
+    # Channels outside any configured guild belong to the home guild
+    def guild_of(self, channel_id):
+        config = self.bot.guild_directory.for_channel(channel_id) or self.bot.HOME_GUILD
+        return SimpleNamespace(id=config.guild_id)
+
+    def raid_session(self, channel_id):
+        state = self.bot.channel_states.get(channel_id)
+        return state.raids.get(channel_id) if state else None
+
+    def channel(self, channel_id):
+        channel = self.channels.get(channel_id)
+        if channel is None:
+            channel = self.channels[channel_id] = FakeChannel(self, channel_id)
+        return channel
+
+    def bot_message(self, channel, content, embed=None):
+        event = {
+            "id": self.new_id(),
+            "author_id": self.bot_user.id,
+            "author_bot": True,
+            "content": content,
+            "embeds": [embed.to_dict()] if embed else [],
+        }
+        message = FakeMessage(self, channel, event)
+        self.messages[message.id] = message
+        return message
+
+    # Gateway echo of a thread created through the fake REST layer
+    def echo_thread(self, channel, thread):
+        notice = FakeMessage(self, channel, {
+            "id": self.new_id(),
+            "author_id": self.bot_user.id,
+            "author_bot": True,
+            "message_type": "thread_created",
+            "reference_id": thread.id,
+            "reference_channel_id": thread.id,
+        })
+        self.spawn("thread_create", self.bot.on_thread_create(thread))
+        self.spawn("thread_notice", self.bot.on_message(notice))
+
+    def spawn(self, feature, coro):
+        task = asyncio.create_task(self.timed(feature, coro))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def timed(self, feature, coro):
+        started = time.perf_counter()
+        try:
+            await coro
+        finally:
+            self.latencies.setdefault(feature, []).append(time.perf_counter() - started)
+
+    def dispatch(self, event):
+        kind = event["type"]
+        channel = self.channel(event["channel_id"])
+
+        if kind == "message":
+            message = FakeMessage(self, channel, event)
+            self.messages[message.id] = message
+            channel.history_messages.append(message)
+            self.spawn(self.feature_of(message), self.bot.on_message(message))
+
+        elif kind == "message_edit":
+            message = self.messages.get(event["id"])
+            if message is None:
+                message = self.messages[event["id"]] = FakeMessage(self, channel, event)
+            message.embeds = [discord.Embed.from_dict(data) for data in event.get("embeds", [])]
+            payload = SimpleNamespace(message_id=message.id, channel_id=channel.id, message=message)
+            self.spawn("message_edit", self.bot.on_raw_message_edit(payload))
+
+        elif kind == "thread_create":
+            thread = FakeThread(self, event["id"], event["parent_id"], event.get("name", "-"))
+            self.spawn("thread_create", self.bot.on_thread_create(thread))
+
+        elif kind == "raid_click":
+            self.spawn(f"raid_{event['button']}", self.raid_click(event))
+
+    def feature_of(self, message):
+        if message.type == discord.MessageType.thread_created:
+            return "thread_notice"
+        route = self.bot.router.resolve(message, message.content.strip().lower())
+        return route[0] if route else "unrouted"
+
+    async def raid_click(self, event):
+        deadline = time.monotonic() + RAID_WAIT
+        session = self.raid_session(event["channel_id"])
+        while (session is None or session.ended) and time.monotonic() < deadline:
+            await asyncio.sleep(0.001)
+            session = self.raid_session(event["channel_id"])
+        if session is None or session.ended:
+            return
+
+        interaction = SimpleNamespace(
+            user=self.user(event["user_id"]),
+            response=FakeInteractionResponse(self.rest),
+            followup=FakeInteractionResponse(self.rest),
+        )
+        for item in session.view.children:
+            if getattr(item, "label", "").lower() == event["button"]:
+                await item.callback(interaction)
+                return
+
+    async def replay(self, events, speed):
+        # Ids handed out by the fake REST layer must not collide with recorded ones
+        self.next_id = max([self.next_id] + [event["id"] for event in events if "id" in event])
+        started = time.perf_counter()
+        for event in events:
+            if speed:
+                delay = event.get("t", 0) / speed - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(0)  # Let handlers started by earlier events run
+            self.dispatch(event)
+
+        while self.tasks:
+            await asyncio.gather(*list(self.tasks), return_exceptions=True)
+        return time.perf_counter() - started
+
+    # Background work the handlers queued: auto threads, batched deletes, digests, catalog writes
+    async def drain(self):
+        bot = self.bot
+        await bot.auto_thread_queue.join()
+        while self.tasks:
+            await asyncio.gather(*list(self.tasks), return_exceptions=True)
+
+        await asyncio.sleep(bot.deletes.delay * 2)
+        await asyncio.gather(*list(bot.deletes.flushing), return_exceptions=True)
+
+        for state in bot.guild_states.values():
+            if state.warnings.flush_task:
+                state.warnings.flush_task.cancel()
+            await state.warnings.flush()
+        await bot.card_catalog.flush()
+
+
+def load_bot(auto_thread):
+    # Keep the replay's journal, catalog and tier files away from the real ones
+    scratch = tempfile.mkdtemp(prefix="inari-replay-")
+    os.environ["AUTO_THREAD"] = "1" if auto_thread else "0"
+    os.environ["CARD_CATALOG"] = os.path.join(scratch, "cards.db")
+    os.environ["JOBS_JOURNAL"] = os.path.join(scratch, "jobs.json")
+    os.environ["TIER_OVERRIDES"] = os.path.join(scratch, "tiers.json")
+    os.environ["THUMBNAIL_CACHE_DIR"] = os.path.join(scratch, "thumb_cache")
+
+    import bot
+    return bot
+
+async def run_replay(events, speed, rest_latency, auto_thread):
+    bot = load_bot(auto_thread)
+    rest = FakeRest(rest_latency)
+    harness = Harness(bot, rest)
+
+    # Fake client: channel lookups resolve to fake channels, thumbnail downloads are REST calls
+    bot.client.get_channel = harness.channel
+
+    async def download(url):
+        return await rest.call("thumbnail_download")
+
+    bot.tier_classifier.download = download
+
+    background = [asyncio.create_task(bot.card_catalog.run()), asyncio.create_task(bot.timers.run())]
+    if bot.AUTO_THREAD_ENABLED:
+        background += [asyncio.create_task(bot.auto_thread_worker()) for _ in range(bot.THREAD_WORKERS)]
+
+    elapsed = await harness.replay(events, speed)
+    await harness.drain()
+    for task in background:
+        task.cancel()
+
+    features = {}
+    for feature, values in sorted(harness.latencies.items()):
+        values.sort()
+        features[feature] = {
+            "count": len(values),
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "max_ms": values[-1] * 1000,
+        }
+
+    return {
+        "events": len(events),
+        "seconds": elapsed,
+        "events_per_second": len(events) / elapsed if elapsed else 0.0,
+        "features": features,
+        "rest_calls": dict(sorted(rest.calls.items())),
+        "rest_calls_total": sum(rest.calls.values()),
+        "actions": bot.actions.stats,
+        "deletes": bot.deletes.stats,
+        "replies": bot.pending_replies.stats,
+        "timers": bot.timers.stats,
+        "warnings": {guild_id: state.warnings.stats for guild_id, state in bot.guild_states.items()},
+        "card_cache_hit_rate": bot.card_cache.hit_rate(),
+    }
+
+def print_report(report):
+    print(f"{report['events']} events in {report['seconds']:.3f}s → {report['events_per_second']:.0f} events/s")
+    print()
+    print(f"{'feature':<16}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for feature, row in report["features"].items():
+        print(
+            f"{feature:<16}{row['count']:>8}{row['p50_ms']:>10.3f}{row['p95_ms']:>10.3f}"
+            f"{row['p99_ms']:>10.3f}{row['max_ms']:>10.3f}"
+        )
+    print()
+    print(f"REST calls: {report['rest_calls_total']}")
+    for route, count in report["rest_calls"].items():
+        print(f"  {route:<20}{count:>8}")
+    print()
+    print(f"actions: {report['actions']}")
+    print(f"deletes: {report['deletes']}")
+    print(f"replies: {report['replies']}")
+    print(f"timers: {report['timers']}")
+    print(f"card cache hit rate: {report['card_cache_hit_rate']:.1%}")
+
+
+# --- Synthetic events from Nairi embed templates (the layout parse_description_for_card_info reads)
+class Synthesizer:
+    def __init__(self, seed):
+        import bot  # Channel ids, tiers and placeholders come from the live config
+
+        self.bot = bot
+        self.random = random.Random(seed)
+        self.events = []
+        self.t = 0.0
+        self.next_id = discord.utils.time_snowflake(discord.utils.utcnow())
+        self.users = [self.random.randrange(10**17, 10**18) for _ in range(200)]
+        self.placeholders = {tier: placeholder for placeholder, tier in TIER_PLACEHOLDER_MAP.items()}
+        self.codes = []
+
+    def new_id(self):
+        self.next_id += self.random.randrange(1, 1 << 22)
+        return self.next_id
+
+    def emit(self, event):
+        self.t += self.random.expovariate(50)  # ~50 events/s of live traffic
+        event["t"] = round(self.t, 4)
+        self.events.append(event)
+        return event
+
+    def message(self, channel_id, author_id, content="", **extra):
+        return self.emit({"type": "message", "id": self.new_id(), "channel_id": channel_id,
+                          "author_id": author_id, "content": content, **extra})
+
+    def card_embed(self, tier, print_number, owner_id):
+        code = "".join(self.random.choices(string.ascii_uppercase + string.digits, k=6))
+        self.codes.append(code)
+        return {
+            "title": f"Character {self.random.randrange(5000)}",
+            "description": (
+                f"**Series {self.random.randrange(500)}**\n"
+                f"`{code}` · `P-{print_number}`\n"
+                f"Owned by <@{owner_id}>"
+            ),
+            "thumbnail": {
+                "url": f"https://cdn.example/tier/{tier}.png",
+                "placeholder": self.placeholders.get(tier, ""),
+            },
+        }
+
+    def nairi_reply(self, channel_id, user_message, embed):
+        reply = {"reference_id": user_message["id"], "author_bot": True}
+        if self.random.random() < 0.5:
+            return self.message(channel_id, self.bot.NAIRI_BOT_ID, embeds=[embed], **reply)
+
+        # Nairi posts the reply first and adds the card embed with an edit
+        message = self.message(channel_id, self.bot.NAIRI_BOT_ID, **reply)
+        self.emit({"type": "message_edit", "id": message["id"], "channel_id": channel_id,
+                   "author_id": self.bot.NAIRI_BOT_ID, "embeds": [embed]})
+        return message
+
+    def enforcement(self):
+        channel_id, rule = self.random.choice(list(self.bot.HOME_GUILD.rules.rules.items()))
+        tier = self.random.choice(rule.tiers)
+        if self.random.random() < 0.2:
+            tier = self.random.choice(list(self.placeholders))  # Possibly the wrong channel
+        low, high = rule.print_range or (1, 2500)
+        print_number = self.random.randint(low, high) if self.random.random() < 0.8 else self.random.randint(1, 2500)
+
+        user_id = self.random.choice(self.users)
+        user_message = self.message(channel_id, user_id, f"nv {self.random.choice(self.codes or ['AAAAAA'])}")
+        self.nairi_reply(channel_id, user_message, self.card_embed(tier, print_number, user_id))
+
+    def chatter(self, channel_id):
+        self.message(channel_id, self.random.choice(self.users), self.random.choice(["hi", "gg", "lf t1", "wts"]))
+
+    def auction_post(self):
+        channel_id = self.random.choice(sorted(self.bot.NAIRI_AUTO_CLOSE_THREAD_CHANNEL_IDS))
+        embed = self.card_embed(self.random.choice(list(self.placeholders)), self.random.randint(1, 2500),
+                                self.random.choice(self.users))
+        self.message(channel_id, self.bot.NAIRI_BOT_ID, embeds=[embed], author_bot=True)
+
+    def auc_reply(self):
+        user_id = self.random.choice(self.users)
+        user_message = self.message(GENERAL_CHANNEL_ID, user_id, "nv")
+        embed = self.card_embed(self.random.choice(["T1", "T2"]), self.random.randint(1, 999), user_id)
+        reply = self.nairi_reply(GENERAL_CHANNEL_ID, user_message, embed)
+        self.message(GENERAL_CHANNEL_ID, user_id, "%auc :jades:", reference_id=reply["id"])
+
+    def auc_code(self):
+        code = self.random.choice(self.codes) if self.codes else "AAAAAA"
+        self.message(GENERAL_CHANNEL_ID, self.random.choice(self.users), f"%auc {code.lower()} jade / coins")
+
+    def raid(self, joins):
+        channel_id = self.bot.LUVI_RAID_CHANNEL_ID
+        owner_id = self.random.choice(self.users)
+        self.message(channel_id, owner_id, "lsr")
+        joined = self.random.sample(self.users, joins)
+        for user_id in joined:
+            self.emit({"type": "raid_click", "channel_id": channel_id, "user_id": user_id, "button": "join"})
+        for user_id in joined[:joins // 6]:
+            self.emit({"type": "raid_click", "channel_id": channel_id, "user_id": user_id, "button": "leave"})
+        self.emit({"type": "raid_click", "channel_id": channel_id, "user_id": owner_id, "button": "end"})
+
+    def generate(self, scenarios, raid_every, raid_joins):
+        enforcement_channels = sorted(self.bot.HOME_GUILD.rules.channel_ids)
+        weighted = [
+            (0.40, self.enforcement),
+            (0.10, lambda: self.chatter(self.random.choice(enforcement_channels))),
+            (0.20, self.auction_post),
+            (0.10, self.auc_reply),
+            (0.10, self.auc_code),
+            (0.10, lambda: self.chatter(GENERAL_CHANNEL_ID)),
+        ]
+        weights = [weight for weight, _ in weighted]
+        scenario_makers = [make for _, make in weighted]
+
+        for index in range(scenarios):
+            if raid_every and index % raid_every == raid_every - 1:
+                self.raid(raid_joins)
+            else:
+                self.random.choices(scenario_makers, weights)[0]()
+        return self.events
+
+
+# --- Recording from the live gateway
+def serialize_message(message, started):
+    event = {
+        "t": round(time.monotonic() - started, 4),
+        "type": "message",
+        "id": message.id,
+        "channel_id": message.channel.id,
+        "author_id": message.author.id,
+        "author_bot": message.author.bot,
+        "content": message.content,
+        "message_type": message.type.name,
+        "embeds": [embed.to_dict() for embed in message.embeds],
+    }
+    if message.reference:
+        event["reference_id"] = message.reference.message_id
+        event["reference_channel_id"] = message.reference.channel_id
+    snapshots = getattr(message, "message_snapshots", None)
+    if snapshots:
+        event["snapshots"] = [
+            {"content": snapshot.content, "embeds": [embed.to_dict() for embed in snapshot.embeds]}
+            for snapshot in snapshots
+        ]
+    return event
+
+def record(path):
+    import bot
+
+    started = time.monotonic()
+    out = gzip.open(path, "wt", encoding="utf-8")
+
+    def write(event):
+        out.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+    async def on_message(message):
+        write(serialize_message(message, started))
+
+    async def on_raw_message_edit(payload):
+        message = payload.message
+        write({
+            "t": round(time.monotonic() - started, 4), "type": "message_edit", "id": message.id,
+            "channel_id": message.channel.id, "author_id": message.author.id,
+            "embeds": [embed.to_dict() for embed in message.embeds],
+        })
+
+    async def on_thread_create(thread):
+        write({"t": round(time.monotonic() - started, 4), "type": "thread_create", "id": thread.id,
+               "parent_id": thread.parent_id, "name": thread.name})
+
+    async def on_interaction(interaction):
+        state = bot.channel_states.get(interaction.channel_id)
+        session = state.raids.get(interaction.channel_id) if state else None
+        custom_id = (interaction.data or {}).get("custom_id")
+        if session is None or custom_id is None:
+            return
+        for item in session.view.children:
+            if getattr(item, "custom_id", None) == custom_id:
+                write({"t": round(time.monotonic() - started, 4), "type": "raid_click",
+                       "channel_id": interaction.channel_id, "user_id": interaction.user.id,
+                       "button": item.label.lower()})
+
+    for listener in (on_message, on_raw_message_edit, on_thread_create, on_interaction):
+        bot.client.add_listener(listener)
+
+    try:
+        bot.client.run(os.getenv("TOKEN"))
+    finally:
+        out.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record, synthesize and replay gateway events against bot.py")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    synth = commands.add_parser("synth", help="generate synthetic events")
+    synth.add_argument("path")
+    synth.add_argument("--scenarios", type=int, default=5000)
+    synth.add_argument("--seed", type=int, default=1)
+    synth.add_argument("--raid-every", type=int, default=500, help="one raid every N scenarios, 0 = none")
+    synth.add_argument("--raid-joins", type=int, default=40)
+
+    run = commands.add_parser("run", help="replay events and report")
+    run.add_argument("path")
+    run.add_argument("--speed", type=float, default=0, help="replay at N× recorded pace, 0 = as fast as possible")
+    run.add_argument("--rest-latency", type=float, default=0.0, help="seconds every fake REST call takes")
+    run.add_argument("--auto-thread", action="store_true", help="thread auction posts as they arrive")
+    run.add_argument("--json", action="store_true", help="print the report as JSON")
+
+    rec = commands.add_parser("record", help="run the bot and record its gateway events")
+    rec.add_argument("path")
+
+    args = parser.parse_args()
+
+    if args.command == "synth":
+        load_bot(False)
+        events = Synthesizer(args.seed).generate(args.scenarios, args.raid_every, args.raid_joins)
+        write_events(args.path, events)
+        print(f"Wrote {len(events)} events to {args.path}")
+
+    elif args.command == "run":
+        events = read_events(args.path)
+        report = asyncio.run(run_replay(events, args.speed, args.rest_latency, args.auto_thread))
+        if args.json:
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            print_report(report)
+
+    elif args.command == "record":
+        record(args.path)
+
+
+if __name__ == "__main__":
+    main()
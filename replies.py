@@ -0,0 +1,67 @@
+# --- Standard library ---
+import asyncio
+
+
+# Correlates Nairi replies with the nv messages waiting on them. A waiter is keyed by
+# (channel_id, user message id) and on_message / on_raw_message_edit route each Nairi
+# message to it with one dict lookup, instead of every waiter running a wait_for
+# predicate against every gateway message. Nairi sometimes posts the reply first and
+# adds the embed with an edit, so a reply without an embed keeps the waiter pending.
+# Timeouts are timers on the shared TimerWheel rather than one wait_for per waiter.
+class PendingReplies:
+    def __init__(self, timers):
+        self.timers = timers
+        self.waiters = {}   # (channel_id, user message id): future resolved with the reply
+        self.by_reply = {}  # reply message id: waiter key, while the embed is still missing
+        self.reply_of = {}  # waiter key: reply message id
+        self.stats = {"resolved": 0, "expired": 0}
+
+    def __len__(self):
+        return len(self.waiters)
+
+    @property
+    def pending(self):
+        return len(self.waiters)
+
+    @property
+    def expired(self):
+        return self.stats["expired"]
+
+    async def wait_for_reply(self, message, timeout):
+        key = (message.channel.id, message.id)
+        future = asyncio.get_running_loop().create_future()
+        self.waiters[key] = future
+        timer = self.timers.schedule(timeout, lambda: self.expire(future))
+
+        try:
+            return await future
+        finally:
+            self.timers.cancel(timer)
+            self.waiters.pop(key, None)
+            self.by_reply.pop(self.reply_of.pop(key, None), None)
+
+    def expire(self, future):
+        if not future.done():
+            future.set_result(None)
+            self.stats["expired"] += 1
+
+    # Fed with every Nairi message create / update from the gateway
+    def feed(self, message):
+        key = self.by_reply.get(message.id)
+        if key is None:
+            if not message.reference:
+                return False
+            key = (message.channel.id, message.reference.message_id)
+
+        future = self.waiters.get(key)
+        if future is None or future.done():
+            return False
+
+        if not message.embeds:
+            self.by_reply[message.id] = key  # Embed arrives with a later edit
+            self.reply_of[key] = message.id
+            return False
+
+        future.set_result(message)
+        self.stats["resolved"] += 1
+        return True
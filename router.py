@@ -0,0 +1,93 @@
+# --- Standard library ---
+import time
+
+# --- Local modules ---
+from metrics import Histogram
+
+END = None  # Trie key marking "a route ends here"
+
+
+# on_message dispatcher built once at startup. Command prefixes live in a character
+# trie walked once per message, and channel handlers in a frozen set / dict, so a
+# message with no prefix in a channel with no handler costs one set lookup.
+class CommandRouter:
+    def __init__(self):
+        self.prefixes = {}          # prefix: (name, handler), until freeze()
+        self.channels = {}          # channel_id: (name, handler)
+        self.trie = {}
+        self.first_chars = frozenset()
+        self.channel_ids = frozenset()
+        self.stats = {}             # route name: {"calls": int, "seconds": float}
+        self.latency = {}           # route name: Histogram of handler seconds
+
+    def prefix(self, name, *prefixes):
+        def decorator(handler):
+            for prefix in prefixes:
+                self.prefixes[prefix] = (name, handler)
+            self.register(name)
+            return handler
+        return decorator
+
+    def channel(self, name, channel_ids):
+        def decorator(handler):
+            for channel_id in channel_ids:
+                if channel_id in self.channels:
+                    raise ValueError(f"Channel {channel_id} already routed to {self.channels[channel_id][0]}")
+                self.channels[channel_id] = (name, handler)
+            self.register(name)
+            return handler
+        return decorator
+
+    def register(self, name):
+        self.stats.setdefault(name, {"calls": 0, "seconds": 0.0})
+        self.latency.setdefault(name, Histogram())
+
+    def freeze(self):
+        self.trie = {}
+        for prefix, route in self.prefixes.items():
+            node = self.trie
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node[END] = route
+
+        self.first_chars = frozenset(self.trie)
+        self.channel_ids = frozenset(self.channels)
+
+    # Longest registered prefix of `content`, same as the old chain of startswith checks
+    def match_prefix(self, content):
+        node = self.trie
+        route = None
+        for char in content:
+            node = node.get(char)
+            if node is None:
+                break
+            route = node.get(END, route)
+        return route
+
+    def resolve(self, message, content):
+        if content[:1] in self.first_chars:
+            route = self.match_prefix(content)
+            if route:
+                return route
+
+        if message.channel.id in self.channel_ids:
+            return self.channels[message.channel.id]
+
+        return None
+
+    async def dispatch(self, message, content):
+        route = self.resolve(message, content)
+        if route is None:
+            return False
+
+        name, handler = route
+        started = time.perf_counter()
+        try:
+            await handler(message, content)
+        finally:
+            elapsed = time.perf_counter() - started
+            stats = self.stats[name]
+            stats["calls"] += 1
+            stats["seconds"] += elapsed
+            self.latency[name].observe(elapsed)
+        return True
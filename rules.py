@@ -0,0 +1,92 @@
+# --- Standard library ---
+from bisect import bisect_right
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+
+
+# One enforcement channel, compiled from its PRINT_RANGES entry
+class ChannelRule(NamedTuple):
+    channel_id: int
+    tiers: tuple                    # Allowed tiers, in config order (for messages)
+    tier_set: frozenset
+    print_range: Optional[tuple]    # (min, max) inclusive, None = printless event channel
+
+    def allows_print(self, print_number):
+        # Printless event channels only take cards without a numbered print
+        if self.print_range is None:
+            return print_number is None
+        if print_number is None:
+            return False
+        return self.print_range[0] <= print_number <= self.print_range[1]
+
+
+class Verdict(NamedTuple):
+    allowed: bool
+    reason: str                     # "ok", "tier" or "print"
+    rule: Optional[ChannelRule]
+    suggested_channel_id: Optional[int]
+
+
+# Immutable index over PRINT_RANGES. Channel rules are a dict lookup, and the
+# "where should this card go" question is a bisect over each tier's sorted,
+# non-overlapping print ranges.
+class RuleIndex:
+    def __init__(self, print_ranges):
+        rules = {}
+        ranged = {}                 # tier: [(min, max, channel_id)]
+        printless = {}              # tier: channel_id
+
+        for channel_id, config in print_ranges.items():
+            tiers = config["tier"]
+            # Normalize to tuple
+            if isinstance(tiers, str):
+                tiers = (tiers,)
+            print_range = tuple(config["range"]) if config["range"] is not None else None
+
+            rules[channel_id] = ChannelRule(channel_id, tuple(tiers), frozenset(tiers), print_range)
+            for tier in tiers:
+                if print_range is None:
+                    printless.setdefault(tier, channel_id)
+                else:
+                    ranged.setdefault(tier, []).append((print_range[0], print_range[1], channel_id))
+
+        self.rules = MappingProxyType(rules)
+        self.channel_ids = frozenset(rules)
+        self.printless = MappingProxyType(printless)
+        self.range_starts = {}
+        self.range_entries = {}
+        for tier, entries in ranged.items():
+            entries.sort()
+            self.range_starts[tier] = tuple(start for start, _, _ in entries)
+            self.range_entries[tier] = tuple(entries)
+        self.range_starts = MappingProxyType(self.range_starts)
+        self.range_entries = MappingProxyType(self.range_entries)
+
+    def suggest(self, tier, print_number):
+        if print_number is None:
+            return self.printless.get(tier)
+
+        starts = self.range_starts.get(tier)
+        if not starts:
+            return None
+
+        index = bisect_right(starts, print_number) - 1
+        if index < 0:
+            return None
+        low, high, channel_id = self.range_entries[tier][index]
+        return channel_id if low <= print_number <= high else None
+
+    def check(self, channel_id, tier, print_number):
+        rule = self.rules.get(channel_id)
+        if rule is None:
+            return Verdict(True, "ok", None, None)  # Not an enforcement channel
+        if tier not in rule.tier_set:
+            return Verdict(False, "tier", rule, self.suggest(tier, print_number))
+        if not rule.allows_print(print_number):
+            return Verdict(False, "print", rule, self.suggest(tier, print_number))
+        return Verdict(True, "ok", rule, None)
+
+    # Audit helper: `cards` yields (channel_id, tier, print_number)
+    def check_many(self, cards):
+        check = self.check
+        return [check(channel_id, tier, print_number) for channel_id, tier, print_number in cards]
@@ -0,0 +1,48 @@
+# Per-user sessions that expire `ttl` seconds after their last use. A session is found
+# by its user or by the message it follows, and both indexes are updated together, so
+# closing one is O(1). Expiry is a timer on the shared TimerWheel, re-armed by touch().
+class SessionStore:
+    def __init__(self, ttl, timers):
+        self.ttl = ttl
+        self.timers = timers
+        self.sessions = {}      # user_id: (timer, message_id, session)
+        self.by_message = {}    # message_id: user_id
+        self.stats = {"opened": 0, "closed": 0, "expired": 0}
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def open(self, user_id, message_id, session):
+        self.close(user_id)  # One session per user, a new message replaces the old one
+        timer = self.timers.schedule(self.ttl, lambda: self.expire(user_id))
+        self.sessions[user_id] = (timer, message_id, session)
+        self.by_message[message_id] = user_id
+        self.stats["opened"] += 1
+        return session
+
+    def get(self, user_id):
+        entry = self.sessions.get(user_id)
+        return entry[2] if entry else None
+
+    def get_by_message(self, message_id):
+        user_id = self.by_message.get(message_id)
+        return self.get(user_id) if user_id is not None else None
+
+    def touch(self, user_id):
+        entry = self.sessions.get(user_id)
+        return entry is not None and self.timers.extend(entry[0], self.ttl)
+
+    def close(self, user_id):
+        entry = self.sessions.pop(user_id, None)
+        if entry is None:
+            return None
+        self.timers.cancel(entry[0])
+        self.by_message.pop(entry[1], None)
+        self.stats["closed"] += 1
+        return entry[2]
+
+    def expire(self, user_id):
+        entry = self.sessions.pop(user_id, None)
+        if entry is not None:
+            self.by_message.pop(entry[1], None)
+            self.stats["expired"] += 1
@@ -0,0 +1,257 @@
+# --- Standard library ---
+import asyncio
+import hashlib
+import io
+import json
+import os
+
+# --- Third-party packages ---
+import aiohttp
+
+# Pillow is optional: without it the perceptual hash fallback is skipped
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# --- Local modules ---
+from parsers import TIER_PLACEHOLDER_MAP, get_placeholder
+
+HASH_SIZE = 8                 # dHash of 8x8 → 64-bit hash
+HASH_MAX_DISTANCE = 6         # Hamming distance still treated as the same tier icon
+URL_MEMO_MAX = 10000          # Thumbnail URLs remembered in memory
+DOWNLOAD_TIMEOUT = 10         # seconds
+
+
+# 64-bit difference hash: shrink to 9x8 grayscale and compare neighbouring pixels.
+# Stable across re-encoding and resizing of the same tier icon.
+def dhash(image_bytes):
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        pixels = list(image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE)).getdata())
+
+    value = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            left = pixels[row * (HASH_SIZE + 1) + col]
+            right = pixels[row * (HASH_SIZE + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return f"{value:016x}"
+
+def hamming(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+# Thumbnails on disk keyed by URL, trimmed oldest-first once over `max_bytes`
+class ThumbnailCache:
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path_for(self, url):
+        return os.path.join(self.directory, hashlib.sha1(url.encode()).hexdigest())
+
+    def read(self, url):
+        path = self.path_for(url)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            return None
+        return data
+
+    def write(self, url, data):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path_for(url), "wb") as f:
+            f.write(data)
+        self.trim()
+
+    def trim(self):
+        entries = [entry for entry in os.scandir(self.directory) if entry.is_file()]
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+            if total <= self.max_bytes:
+                break
+            total -= entry.stat().st_size
+            os.remove(entry.path)
+
+
+# Card tier lookup in two steps. The hot path is a dict lookup of the thumbnail
+# placeholder (built-in map plus placeholders registered at runtime). For an unknown
+# placeholder the thumbnail is downloaded once (memoized on disk by URL), reduced to
+# a perceptual hash and matched against the hashes of known tier icons. Those hashes
+# are learnt in the background from the first card of each tier whose placeholder is
+# known (see learn), or registered with %tier.
+class TierClassifier:
+    def __init__(self, overrides_path, cache_dir, cache_max_bytes, rule_tiers=()):
+        self.overrides_path = overrides_path
+        self.thumbnails = ThumbnailCache(cache_dir, cache_max_bytes)
+        self.placeholders = dict(TIER_PLACEHOLDER_MAP)  # placeholder: tier
+        self.hashes = {}                                # dhash: tier
+        self.url_tiers = {}                             # thumbnail url: tier ("" if unknown)
+        self.rule_tiers = frozenset(rule_tiers)         # Tier names enforcement rules use
+        self.learning = set()                           # Tiers whose icon is being hashed
+        self.learn_tried = set()                        # Thumbnail urls already hashed for learn
+        self.tasks = set()
+        self.session = None
+        self.stats = {"placeholder_hits": 0, "url_hits": 0, "hash_hits": 0, "unknown": 0, "downloads": 0, "learnt": 0}
+        self.load_overrides()
+
+    def load_overrides(self):
+        try:
+            with open(self.overrides_path, "r", encoding="utf-8") as f:
+                overrides = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.placeholders.update(
+            (placeholder, tier) for placeholder, tier in overrides.get("placeholders", {}).items()
+            if placeholder not in TIER_PLACEHOLDER_MAP  # Built-ins win over older saved overrides
+        )
+        self.hashes.update(overrides.get("hashes", {}))
+
+    def save_overrides(self):
+        overrides = {
+            "placeholders": {
+                placeholder: tier for placeholder, tier in self.placeholders.items()
+                if TIER_PLACEHOLDER_MAP.get(placeholder) != tier
+            },
+            "hashes": self.hashes,
+        }
+        tmp_path = f"{self.overrides_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(overrides, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.overrides_path)
+
+    # O(1), no I/O
+    def classify_fast(self, embed):
+        tier = self.placeholders.get(get_placeholder(embed))
+        if tier:
+            self.stats["placeholder_hits"] += 1
+            return tier
+
+        url = embed.thumbnail.url if embed.thumbnail else None
+        tier = self.url_tiers.get(url) if url else None
+        if tier:
+            self.stats["url_hits"] += 1
+        return tier or ""
+
+    async def classify(self, embed):
+        tier = self.classify_fast(embed)
+        if tier or Image is None:
+            return tier
+
+        url = embed.thumbnail.url if embed.thumbnail else None
+        if not url or url in self.url_tiers:
+            return ""  # Known miss
+
+        image_hash = await self.hash_thumbnail(url)
+        tier = self.match_hash(image_hash) if image_hash else ""
+        if len(self.url_tiers) >= URL_MEMO_MAX:
+            self.url_tiers.clear()
+        self.url_tiers[url] = tier
+        self.stats["hash_hits" if tier else "unknown"] += 1
+        return tier
+
+    # Called with cards whose tier came from a known placeholder: the first thumbnail of
+    # each tier without a hash is hashed in the background, so icons with an unknown
+    # placeholder can still be matched to the built-in tiers.
+    def learn(self, embed, tier):
+        if Image is None or not tier or tier in self.learning or tier in self.hashes.values():
+            return
+        url = embed.thumbnail.url if embed.thumbnail else None
+        if not url or url in self.learn_tried:
+            return
+
+        self.learning.add(tier)
+        self.learn_tried.add(url)
+        task = asyncio.create_task(self.learn_hash(url, tier))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def learn_hash(self, url, tier):
+        try:
+            image_hash = await self.hash_thumbnail(url)
+            if image_hash and image_hash not in self.hashes:
+                self.hashes[image_hash] = tier
+                self.stats["learnt"] += 1
+                await asyncio.to_thread(self.save_overrides)
+        finally:
+            self.learning.discard(tier)
+
+    def match_hash(self, image_hash):
+        tier = self.hashes.get(image_hash)
+        if tier:
+            return tier
+
+        # Few tier icons are known, so the nearest-neighbour scan stays cheap
+        best = min(self.hashes.items(), key=lambda item: hamming(item[0], image_hash), default=None)
+        if best and hamming(best[0], image_hash) <= HASH_MAX_DISTANCE:
+            return best[1]
+        return ""
+
+    async def hash_thumbnail(self, url):
+        data = await asyncio.to_thread(self.thumbnails.read, url)
+        if data is None:
+            data = await self.download(url)
+            if data is None:
+                return None
+            await asyncio.to_thread(self.thumbnails.write, url, data)
+
+        try:
+            return await asyncio.to_thread(dhash, data)
+        except Exception:
+            return None  # Not an image Pillow can read
+
+    async def download(self, url):
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=DOWNLOAD_TIMEOUT))
+
+        self.stats["downloads"] += 1
+        try:
+            async with self.session.get(url) as response:
+                if response.status != 200:
+                    return None
+                return await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None
+
+    # Tier names %tier accepts: those enforcement rules use plus those already known,
+    # matched case-insensitively. None for anything else.
+    def known_tier(self, name):
+        known = self.rule_tiers | set(self.placeholders.values()) | set(self.hashes.values())
+        return next((tier for tier in known if tier.lower() == name.lower()), None)
+
+    # Admin registration: placeholder → tier, plus the icon's hash when Pillow is available.
+    # Built-in placeholders and icons already hashed as a built-in tier are never
+    # re-tiered, one mistaken %tier would otherwise move every such card for good.
+    async def register(self, embed, tier):
+        registered = False
+        placeholder = get_placeholder(embed)
+        builtin = TIER_PLACEHOLDER_MAP.get(placeholder)
+        if builtin:
+            raise ValueError(f"This thumbnail is built in as **{builtin}** and cannot be changed.")
+
+        url = embed.thumbnail.url if embed.thumbnail else None
+        image_hash = await self.hash_thumbnail(url) if url and Image is not None else None
+        current = self.hashes.get(image_hash)
+        if current and current != tier and current in TIER_PLACEHOLDER_MAP.values():
+            raise ValueError(f"This thumbnail is the **{current}** icon and cannot be changed.")
+
+        if placeholder:
+            self.placeholders[placeholder] = tier
+            registered = True
+        if image_hash:
+            self.hashes[image_hash] = tier
+            registered = True
+
+        # Forget cached misses, they may be this tier
+        self.url_tiers = {url: known for url, known in self.url_tiers.items() if known}
+        await asyncio.to_thread(self.save_overrides)
+        return registered
+
+    async def close(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.session and not self.session.closed:
+            await self.session.close()
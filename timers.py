@@ -0,0 +1,96 @@
+# --- Standard library ---
+import asyncio
+import math
+import time
+
+TICK = 0.5          # seconds per wheel slot
+WHEEL_SLOTS = 512   # One revolution = 256s, longer timers wait out extra rounds
+
+
+class Timer:
+    def __init__(self, callback):
+        self.callback = callback
+        self.slot = None        # Index in the wheel, None once fired or cancelled
+        self.rounds = 0         # Revolutions left before it is due
+
+
+# Hashed timer wheel driving every short-lived TTL in the bot from one task. A timer
+# lands in the slot its deadline hashes to; the task advances one slot per tick and
+# fires the timers there whose rounds have run out. Schedule, cancel and extend are
+# O(1) set operations, and a timer fires no earlier than its deadline and at most one
+# tick after it. Callbacks may return a coroutine, which is run as a task.
+class TimerWheel:
+    def __init__(self, tick=TICK, slots=WHEEL_SLOTS):
+        self.tick = tick
+        self.slots = [set() for _ in range(slots)]
+        self.position = 0
+        self.next_tick = time.monotonic() + tick   # When the slot after `position` is processed
+        self.live = 0
+        self.tasks = set()                          # Coroutine callbacks in flight
+        self.stats = {"scheduled": 0, "fired": 0, "cancelled": 0, "extended": 0}
+
+    def __len__(self):
+        return self.live
+
+    def place(self, timer, delay):
+        due = time.monotonic() + delay
+        ticks = max(1, math.ceil((due - self.next_tick) / self.tick) + 1)
+        timer.slot = (self.position + ticks) % len(self.slots)
+        timer.rounds = (ticks - 1) // len(self.slots)
+        self.slots[timer.slot].add(timer)
+
+    def schedule(self, delay, callback):
+        timer = Timer(callback)
+        self.place(timer, delay)
+        self.live += 1
+        self.stats["scheduled"] += 1
+        return timer
+
+    def cancel(self, timer):
+        if timer is None or timer.slot is None:
+            return False
+        self.slots[timer.slot].discard(timer)
+        timer.slot = None
+        self.live -= 1
+        self.stats["cancelled"] += 1
+        return True
+
+    # Push the deadline to `delay` seconds from now; False if the timer already fired
+    def extend(self, timer, delay):
+        if timer.slot is None:
+            return False
+        self.slots[timer.slot].discard(timer)
+        self.place(timer, delay)
+        self.stats["extended"] += 1
+        return True
+
+    def advance(self):
+        self.position = (self.position + 1) % len(self.slots)
+        slot = self.slots[self.position]
+        due = [timer for timer in slot if timer.rounds == 0]
+        for timer in slot:
+            timer.rounds -= 1
+        for timer in due:
+            slot.discard(timer)
+            timer.slot = None
+            self.live -= 1
+            self.stats["fired"] += 1
+            self.fire(timer)
+
+    def fire(self, timer):
+        try:
+            result = timer.callback()
+        except Exception:
+            return  # One failing callback must not stop the wheel
+        if asyncio.iscoroutine(result):
+            task = asyncio.create_task(result)
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(max(0.0, self.next_tick - time.monotonic()))
+            now = time.monotonic()
+            while self.next_tick <= now:
+                self.next_tick += self.tick
+                self.advance()
@@ -0,0 +1,53 @@
+# --- Third-party packages ---
+from aiohttp import web
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# Keepalive, health and metrics endpoints served by aiohttp on the bot's own event loop.
+# The checks are plain callables reading bot state directly: same loop, no locks, no
+# threads. A blocked loop simply stops answering, which the pinger sees as a failure.
+class WebServer:
+    def __init__(self, host, port, health, readiness, metrics):
+        self.host = host
+        self.port = port
+        self.health = health          # () -> (ok, reason)
+        self.readiness = readiness    # () -> (ok, reason)
+        self.metrics = metrics        # () -> Prometheus text
+        self.runner = None
+
+    async def start(self):
+        if self.runner is not None:
+            return
+
+        app = web.Application()
+        app.add_routes([
+            web.get("/", self.index),
+            web.get("/healthz", self.healthz),
+            web.get("/readyz", self.readyz),
+            web.get("/metrics", self.render_metrics),
+        ])
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    def status(self, check, ok_text=None):
+        ok, reason = check()
+        return web.Response(text=ok_text if ok and ok_text else reason, status=200 if ok else 503)
+
+    async def index(self, request):
+        return self.status(self.health, "Bot is running!")
+
+    async def healthz(self, request):
+        return self.status(self.health)
+
+    async def readyz(self, request):
+        return self.status(self.readiness)
+
+    async def render_metrics(self, request):
+        return web.Response(body=self.metrics().encode(), headers={"Content-Type": PROMETHEUS_CONTENT_TYPE})